@@ -1,28 +1,46 @@
-from statsmodels.tsa.stattools import pacf, acf
-import numpy as np
-import pandas as pd
 import os
 import matplotlib.pyplot as plt
+import pyarrow.parquet as pq
+
+from acf_engine import StreamingStats
+from fast_loader import excel_to_parquet
+from LPF import iter_parquet_chunks, parquet_column_ranges
 
 file_path = os.path.join(os.path.dirname(__file__), 'generated_data',
                          'new_entries_combined.xlsx')
+# The workbook is copied once to Parquet in row batches, then read back batch by batch
+parquet_path = os.path.splitext(file_path)[0] + '.parquet'
+
+nlags = 50
+bins = 20
+batch_size = 100000  # Rows per batch; also the rows shown in the lag scatter
 
-# Read the Excel file
-df = pd.read_excel(file_path)
+if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(file_path):
+    excel_to_parquet(file_path, parquet_path, batch_rows=batch_size)
 
-df_col = df.columns
+df_col = pq.ParquetFile(parquet_path).schema_arrow.names
 
-nlags = 50
+# Histograms, ACF and PACF in one pass. The histogram range comes from the Parquet
+# statistics, so the bins equal plt.hist(bins=20) on the full columns
+streaming = StreamingStats(nlags=nlags, bins=bins, hist_range=parquet_column_ranges(parquet_path))
+data = None
+for chunk in iter_parquet_chunks(parquet_path, batch_size=batch_size):
+    if data is None:
+        data = chunk  # First batch, for the lag scatter
+    streaming.update(chunk)
+stats = streaming.result(alpha=None)
 
-for col in df_col:
+for i, col in enumerate(df_col):
 
-    # Example time series data
-    time_series = df[col].to_numpy()
+    # Example time series data (the first batch)
+    time_series = data[:, i]
 
-    # Plot the histogram
+    # Plot the histogram from the streamed counts
+    edges = stats['bin_edges'][i]
     plt.figure(figsize=(8, 5))
-    plt.hist(time_series, bins=20, edgecolor='black', alpha=0.7)
-    plt.title(f"Histogram of {col}")
+    plt.hist(edges[:-1], bins=edges, weights=stats['histogram'][:, i], edgecolor='black', alpha=0.7)
+    outside = stats['underflow'][i] + stats['overflow'][i]
+    plt.title(f"Histogram of {col}" + (f" ({outside} values outside the bins)" if outside else ""))
     plt.xlabel("Value")
     plt.ylabel("Frequency")
     plt.grid(axis="y", linestyle="--", alpha=0.7)
@@ -40,8 +58,7 @@ for col in df_col:
     plt.grid()
     plt.show()
 
-    # Calculate the ACF
-    acf_values = acf(time_series, nlags=nlags)
+    acf_values = stats['acf'][:, i]
 
     # Plot the ACF
     plt.figure(figsize=(8, 5))
@@ -52,8 +69,7 @@ for col in df_col:
     plt.grid()
     plt.show()
 
-    # Calculate the PACF
-    pacf_values = pacf(time_series, nlags=nlags, method="yw")
+    pacf_values = stats['pacf'][:, i]
 
     # Plot the PACF
     plt.figure(figsize=(8, 5))
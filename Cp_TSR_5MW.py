@@ -1,65 +1,36 @@
-import numpy as np
+import os
 import matplotlib.pyplot as plt
+from rotor_performance import load_rotor_performance
+from steady_state import cp_optimum
 
-# Data
-tsr = np.array([2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5, 
-                10.0, 10.5, 11.0, 11.5, 12.0, 12.5, 13.0, 13.5, 14.0, 14.5])
+# Data: rotor performance tables of the NREL 5MW (26 TSR rows x 36 pitch columns)
+table = load_rotor_performance(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Cp_Ct_Cq.NREL5MW.txt'))
+tsr = table.tsr
+pitch_angles = table.pitch
+cp_matrix = table.Cp
 
-pitch_angles = np.array([-5.0, -4.0, -3.0, -2.0, -1.0, 0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 
-                         9.0, 10.0, 11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0, 18.0, 19.0, 20.0, 
-                         21.0, 22.0, 23.0, 24.0, 25.0, 26.0, 27.0, 28.0, 29.0, 30.0])
-
-# Power coefficient matrix (26 rows for TSR, 36 columns for pitch angles)
-cp_matrix = np.array([
-    [0.006673, 0.009813, 0.013077, 0.016508, 0.020122, 0.023918, 0.027887, 0.032006, 0.036239, 0.040540, 0.044858, 0.049138, 0.053326, 0.057366, 0.061205, 0.064796, 0.068092, 0.071051, 0.073631, 0.075796, 0.077520, 0.078793, 0.079607, 0.079960, 0.079851, 0.079303, 0.078341, 0.076993, 0.075269, 0.073154, 0.070619, 0.067607, 0.064059, 0.059976, 0.055381, 0.050328],
-    [0.020093, 0.026879, 0.033876, 0.041034, 0.048264, 0.055472, 0.062560, 0.069438, 0.076024, 0.082246, 0.088041, 0.093349, 0.098111, 0.102262, 0.105746, 0.108521, 0.110563, 0.111865, 0.112435, 0.112304, 0.111503, 0.110082, 0.108043, 0.105376, 0.102031, 0.097898, 0.092907, 0.087092, 0.080496, 0.073183, 0.065206, 0.056618, 0.047499, 0.037976, 0.028144, 0.018084],
-    [0.048757, 0.059921, 0.070879, 0.081507, 0.091686, 0.101314, 0.110305, 0.118583, 0.126073, 0.132692, 0.138350, 0.142964, 0.146489, 0.148944, 0.150362, 0.150761, 0.150158, 0.148560, 0.145993, 0.142397, 0.137607, 0.131540, 0.124241, 0.115747, 0.106162, 0.095542, 0.084011, 0.071754, 0.058916, 0.045611, 0.031929, 0.017939, 0.003701, -0.010721, -0.025259, -0.039848],
-    [0.090123, 0.104877, 0.118836, 0.131894, 0.143960, 0.154953, 0.164780, 0.173312, 0.180438, 0.186134, 0.190421, 0.193294, 0.194678, 0.194534, 0.192872, 0.189595, 0.184490, 0.177562, 0.168848, 0.158486, 0.146540, 0.133154, 0.118581, 0.103012, 0.086606, 0.069499, 0.051807, 0.033628, 0.015033, -0.003935, -0.023212, -0.042681, -0.062203, -0.081676, -0.101014, -0.120137],
-    [0.139124, 0.156683, 0.172901, 0.187702, 0.200999, 0.212709, 0.222753, 0.231064, 0.237530, 0.241950, 0.244105, 0.243810, 0.240834, 0.235185, 0.226970, 0.216406, 0.203596, 0.188826, 0.172423, 0.154596, 0.135473, 0.115192, 0.093900, 0.071756, 0.048901, 0.025448, 0.001458, -0.023067, -0.048079, -0.073394, -0.098747, -0.123894, -0.148637, -0.172971, -0.196999, -0.220426],
-    [0.191782, 0.211839, 0.230276, 0.247076, 0.262109, 0.275108, 0.285675, 0.293225, 0.297120, 0.296898, 0.292698, 0.284905, 0.273940, 0.260137, 0.243968, 0.225765, 0.205747, 0.184044, 0.160751, 0.135955, 0.109826, 0.082563, 0.054349, 0.025323, -0.004446, -0.034984, -0.066317, -0.098275, -0.130442, -0.162296, -0.193412, -0.223707, -0.253665, -0.283545, -0.312671, -0.340141],
-    [0.246353, 0.270341, 0.292682, 0.312827, 0.329812, 0.342452, 0.349588, 0.350796, 0.346468, 0.337517, 0.324917, 0.309376, 0.291272, 0.270832, 0.248190, 0.223439, 0.196656, 0.167952, 0.137415, 0.105259, 0.071726, 0.037018, 0.001262, -0.035533, -0.073456, -0.112507, -0.152329, -0.192145, -0.231094, -0.268667, -0.305110, -0.341553, -0.378474, -0.414899, -0.449086, -0.478908],
-    [0.306243, 0.335683, 0.361286, 0.381426, 0.394666, 0.400011, 0.397807, 0.389766, 0.377676, 0.362345, 0.344063, 0.323009, 0.299287, 0.272921, 0.243930, 0.212388, 0.178407, 0.142107, 0.103741, 0.063607, 0.021945, -0.021117, -0.065611, -0.111678, -0.159287, -0.207873, -0.256248, -0.303158, -0.347971, -0.391262, -0.434965, -0.480253, -0.525739, -0.568955, -0.606708, -0.638532],
-    [0.368062, 0.397982, 0.420678, 0.434161, 0.438041, 0.434596, 0.426094, 0.413722, 0.397833, 0.378568, 0.356023, 0.330207, 0.301063, 0.268542, 0.232706, 0.193700, 0.151740, 0.107083, 0.060108, 0.011125, -0.039710, -0.092454, -0.147289, -0.204180, -0.262421, -0.320480, -0.376558, -0.429701, -0.480649, -0.532192, -0.586717, -0.643176, -0.698195, -0.746783, -0.788014, -0.825218],
-    [0.413915, 0.437699, 0.451902, 0.458070, 0.457967, 0.452866, 0.443478, 0.429833, 0.411921, 0.389793, 0.363427, 0.332762, 0.297737, 0.258384, 0.214897, 0.167596, 0.116800, 0.062939, 0.006435, -0.052490, -0.113873, -0.177938, -0.244676, -0.313397, -0.382360, -0.449143, -0.512100, -0.571792, -0.631581, -0.695509, -0.764242, -0.833635, -0.896797, -0.950560, -0.998368, -1.044827],
-    [0.427324, 0.444280, 0.455448, 0.462056, 0.464498, 0.462253, 0.454597, 0.441298, 0.422256, 0.397517, 0.367139, 0.331124, 0.289519, 0.242518, 0.190536, 0.134077, 0.073568, 0.009566, -0.057573, -0.127803, -0.201376, -0.278345, -0.358171, -0.439117, -0.518328, -0.593032, -0.663068, -0.731776, -0.804602, -0.885395, -0.971040, -1.052725, -1.123154, -1.184540, -1.242706, -1.302084],
-    [0.413889, 0.430080, 0.443986, 0.455667, 0.463490, 0.465861, 0.461379, 0.449315, 0.429515, 0.402103, 0.367325, 0.325347, 0.276400, 0.220931, 0.159637, 0.093102, 0.021935, -0.053297, -0.132381, -0.215535, -0.302917, -0.394172, -0.487834, -0.580989, -0.669719, -0.752399, -0.831452, -0.912845, -1.003839, -1.105589, -1.208911, -1.301214, -1.380509, -1.453087, -1.525242, -1.600224],
-    [0.390738, 0.409602, 0.427384, 0.443933, 0.457445, 0.465005, 0.464411, 0.454181, 0.433864, 0.403639, 0.364016, 0.315425, 0.258360, 0.193623, 0.122136, 0.044567, -0.038313, -0.126023, -0.218606, -0.316340, -0.419059, -0.525699, -0.633667, -0.738622, -0.836834, -0.928785, -1.019688, -1.118620, -1.233318, -1.358741, -1.478110, -1.581346, -1.672639, -1.759983, -1.849169, -1.941926],
-    [0.363054, 0.386720, 0.409228, 0.429996, 0.447852, 0.460425, 0.463989, 0.456010, 0.435373, 0.402165, 0.357222, 0.301344, 0.235402, 0.160566, 0.077923, -0.011703, -0.107479, -0.209107, -0.316861, -0.430808, -0.550233, -0.673151, -0.795604, -0.912315, -1.020857, -1.123956, -1.230487, -1.353172, -1.496497, -1.645302, -1.779751, -1.896314, -2.002958, -2.108318, -2.217267, -2.330606],
-    [0.332023, 0.361556, 0.389367, 0.414649, 0.436246, 0.452807, 0.460431, 0.454894, 0.434075, 0.397696, 0.346937, 0.283092, 0.207494, 0.121668, 0.026850, -0.075950, -0.185943, -0.303110, -0.427726, -0.559435, -0.696810, -0.836734, -0.973950, -1.103096, -1.222996, -1.339770, -1.467400, -1.620400, -1.794614, -1.965735, -2.116279, -2.249130, -2.374431, -2.500966, -2.632648, -2.770283],
-    [0.297995, 0.333854, 0.367528, 0.397656, 0.423215, 0.442899, 0.454053, 0.450936, 0.429986, 0.390235, 0.333142, 0.260640, 0.174562, 0.076794, -0.031277, -0.148468, -0.274167, -0.408575, -0.551737, -0.702675, -0.859149, -1.016871, -1.169580, -1.311915, -1.444423, -1.578792, -1.734397, -1.922541, -2.128205, -2.321411, -2.490350, -2.642587, -2.789846, -2.940844, -3.098986, -3.264660],
-    [0.261597, 0.303619, 0.343502, 0.378889, 0.408674, 0.431280, 0.445167, 0.444233, 0.423112, 0.379761, 0.315806, 0.233927, 0.136491, 0.025768, -0.096686, -0.229613, -0.372646, -0.526034, -0.689370, -0.860978, -1.037730, -1.214335, -1.383513, -1.539437, -1.686737, -1.844401, -2.034203, -2.260837, -2.498120, -2.714447, -2.904511, -3.079332, -3.251981, -3.431224, -3.619857, -3.816817],
-    [0.223751, 0.271311, 0.317227, 0.358217, 0.392491, 0.418111, 0.434088, 0.434927, 0.413446, 0.366239, 0.294883, 0.202866, 0.093151, -0.031589, -0.169648, -0.319787, -0.481868, -0.655988, -0.841105, -1.034831, -1.233270, -1.430180, -1.616348, -1.786462, -1.952417, -2.139500, -2.368690, -2.636225, -2.905702, -3.147086, -3.361213, -3.561934, -3.763787, -3.975522, -4.198409, -4.429489],
-    [0.185578, 0.237532, 0.288993, 0.335546, 0.374551, 0.403289, 0.421002, 0.423063, 0.400961, 0.349628, 0.270309, 0.167352, 0.044405, -0.095487, -0.250473, -0.419415, -0.602317, -0.798913, -1.007440, -1.224860, -1.446724, -1.665242, -1.868434, -2.054428, -2.244050, -2.466255, -2.739406, -3.049892, -3.352672, -3.621561, -3.862815, -4.093010, -4.328409, -4.576896, -4.837351, -5.105458],
-    [0.147095, 0.203239, 0.259075, 0.310894, 0.354752, 0.386719, 0.405978, 0.408744, 0.385629, 0.329881, 0.242007, 0.127271, -0.009910, -0.166158, -0.339498, -0.528928, -0.734472, -0.955298, -1.188911, -1.431845, -1.679152, -1.920015, -2.140330, -2.345296, -2.563821, -2.826409, -3.147779, -3.503220, -3.840906, -4.140058, -4.411660, -4.675361, -4.948974, -5.238172, -5.539321, -5.847566],
-    [0.109921, 0.168465, 0.228283, 0.284493, 0.333003, 0.368316, 0.389001, 0.392004, 0.367452, 0.306944, 0.209888, 0.082498, -0.069969, -0.243863, -0.437077, -0.648769, -0.878808, -1.125646, -1.386141, -1.656724, -1.931386, -2.194733, -2.433122, -2.661010, -2.913585, -3.221522, -3.595200, -3.997663, -4.372318, -4.704715, -5.010142, -5.311913, -5.628384, -5.961897, -6.307013, -6.658699],
-    [0.075556, 0.133907, 0.196815, 0.256499, 0.309270, 0.347981, 0.370019, 0.372880, 0.346417, 0.280755, 0.173858, 0.032901, -0.135979, -0.328881, -0.543585, -0.779386, -1.035790, -1.310469, -1.599847, -1.900506, -2.203972, -2.489774, -2.748220, -3.003362, -3.294941, -3.653136, -4.083147, -4.534716, -4.948847, -5.317645, -5.660775, -6.005570, -6.369299, -6.750614, -7.143160, -7.541782],
-    [0.045437, 0.101086, 0.164731, 0.227521, 0.283675, 0.325613, 0.348964, 0.351362, 0.322521, 0.251245, 0.133815, -0.021672, -0.208162, -0.421508, -0.659413, -0.921225, -1.205892, -1.510319, -1.830843, -2.164074, -2.497172, -2.805822, -3.087060, -3.374013, -3.709339, -4.122787, -4.613131, -5.115993, -5.572447, -5.980987, -6.366170, -6.759084, -7.174174, -7.606904, -8.050518, -8.499762],
-    [0.020095, 0.070625, 0.132961, 0.197686, 0.256313, 0.301131, 0.325760, 0.327415, 0.295744, 0.218342, 0.089649, -0.081378, -0.286748, -0.522056, -0.784958, -1.074719, -1.389587, -1.725804, -2.080005, -2.448103, -2.811255, -3.143907, -3.451088, -3.774480, -4.158169, -4.632027, -5.186626, -5.743189, -6.245055, -6.696930, -7.128978, -7.575043, -8.045426, -8.533374, -9.031865, -9.535604],
-    [-0.001687, 0.043909, 0.102330, 0.166837, 0.227413, 0.274487, 0.300332, 0.301010, 0.266040, 0.181968, 0.041242, -0.146395, -0.371984, -0.630855, -0.920613, -1.240294, -1.587356, -1.957580, -2.348192, -2.753074, -3.146694, -3.505110, -3.841738, -4.206100, -4.642786, -5.182427, -5.805056, -6.418029, -6.968601, -7.467747, -7.951835, -8.455876, -8.985506, -9.532652, -10.089996, -10.652280],
-    [-0.020991, 0.020364, 0.073330, 0.135754, 0.197326, 0.245733, 0.272607, 0.272110, 0.233378, 0.142039, -0.011538, -0.216915, -0.464126, -0.748233, -1.066769, -1.418378, -1.799699, -2.206350, -2.636179, -3.079288, -3.504186, -3.890511, -4.260392, -4.670103, -5.164549, -5.775547, -6.469853, -7.142266, -7.745026, -8.295764, -8.837283, -9.403900, -9.996885, -10.607377, -11.227722, -11.852766]
-])
+# Maximum-Cp point of the table
+optimum = cp_optimum(table)
+print(f"Max Cp = {optimum['cp_max']:.4f} at TSR = {optimum['tsr_opt']} and pitch = {optimum['pitch_opt']} deg")
 
 # Create line plot
 plt.figure(figsize=(14, 10))
 
+# Non-negative Cp region for all pitch angles at once
+non_negative = cp_matrix >= 0
+
 # Plot a line for each pitch angle, including only non-negative Cp values
 for j in range(len(pitch_angles)):
-    # Collect TSR and Cp values for this pitch angle where Cp >= 0
-    tsr_line = []
-    cp_line = []
-    for i in range(len(tsr)):
-        if cp_matrix[i, j] >= 0:
-            tsr_line.append(tsr[i])
-            cp_line.append(cp_matrix[i, j])
+    tsr_line = tsr[non_negative[:, j]]
+    cp_line = cp_matrix[non_negative[:, j], j]
     # Plot line if there are enough points (at least 2)
     if len(tsr_line) > 1:
         plt.plot(tsr_line, cp_line, linewidth=1.5)
         # Annotate all pitch angles at the last point of the line
-        if len(tsr_line) > 0:
-            # Adjust vertical alignment slightly based on pitch angle to reduce overlap
-            va = 'center' if j % 2 == 0 else 'bottom' if j % 4 == 1 else 'top'
-            plt.text(tsr_line[-1] + 0.1, cp_line[-1], f'{pitch_angles[j]}°', 
-                     fontsize=10, ha='left', va=va, color='black')
+        # Adjust vertical alignment slightly based on pitch angle to reduce overlap
+        va = 'center' if j % 2 == 0 else 'bottom' if j % 4 == 1 else 'top'
+        plt.text(tsr_line[-1] + 0.1, cp_line[-1], f'{pitch_angles[j]}°',
+                 fontsize=10, ha='left', va=va, color='black')
 
 # Customize plot
 plt.xlabel('Tip Speed Ratio (TSR)')
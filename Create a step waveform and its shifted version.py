@@ -1,45 +1,38 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-def create_step_waveform(t, steps, step_times, shift=0):
+from input_profiles import StepProfile
+
+def create_step_waveform(t, steps, step_times, shift=0, plot=True):
     """
-    Create a step waveform and its shifted version, then plot both.
+    Create a step waveform and its shifted version, optionally plotting both.
     
     Parameters:
     t : array-like, time points where waveform is evaluated
     steps : array-like, step values
     step_times : array-like, times when steps occur
     shift : float, time shift for the shifted waveform (default=0)
+    plot : bool, plot both waveforms (default=True)
     
     Returns:
     wd : numpy array, original waveform values at time points t
     wd_shifted : numpy array, shifted waveform values at time points t
     """
-    # Create original waveform
-    wd = np.zeros_like(t)
-    for i in range(1, len(step_times)):
-        mask = (t >= step_times[i-1]) & (t < step_times[i])
-        wd[mask] = steps[i-1]
-    wd[t >= step_times[-1]] = steps[-1]
-    
-    # Create shifted waveform
-    wd_shifted = np.zeros_like(t)
-    shifted_times = [t + shift for t in step_times]
-    for i in range(1, len(shifted_times)):
-        mask = (t >= shifted_times[i-1]) & (t < shifted_times[i])
-        wd_shifted[mask] = steps[i-1]
-    wd_shifted[t >= shifted_times[-1]] = steps[-1]
+    t = np.asarray(t)
+    profile = StepProfile(step_times, steps)
+    wd = profile.evaluate(t).astype(t.dtype, copy=False)
+    wd_shifted = profile.shifted(shift).evaluate(t).astype(t.dtype, copy=False)
     
-    # Plot both waveforms
-    plt.figure(figsize=(10, 6))
-    plt.step(t, wd, label='Original Waveform', where='post')
-    plt.step(t, wd_shifted, label=f'Shifted Waveform (by {shift})', where='post')
-    plt.xlabel('Time')
-    plt.ylabel('Amplitude')
-    plt.title('Step Waveform and Shifted Waveform')
-    plt.grid(True)
-    plt.legend()
-    plt.show()
+    if plot:
+        plt.figure(figsize=(10, 6))
+        plt.step(t, wd, label='Original Waveform', where='post')
+        plt.step(t, wd_shifted, label=f'Shifted Waveform (by {shift})', where='post')
+        plt.xlabel('Time')
+        plt.ylabel('Amplitude')
+        plt.title('Step Waveform and Shifted Waveform')
+        plt.grid(True)
+        plt.legend()
+        plt.show()
     
     return wd, wd_shifted
 
@@ -1,5 +1,59 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.signal import lfilter
+
+
+def _lp_filter_2d(x, wdt, x_last, y_last):
+    """Filter a (n_samples, n_channels) block given corner_freq * dt per channel."""
+    y = np.empty_like(x)
+    if x.shape[0] == 0:
+        return y, x_last.copy(), y_last.copy()
+
+    # Channels sharing a corner frequency are filtered together in one call
+    for w in np.unique(wdt):
+        cols = np.flatnonzero(wdt == w)
+        a1, a0, b1, b0 = 2 + w, w - 2, w, w
+        # Direct-form II transposed state reproducing the previous sample pair
+        zi = (b0 * x_last[cols] - a0 * y_last[cols]) / a1
+        y[:, cols], _ = lfilter([b1, b0], [a1, a0], x[:, cols], axis=0, zi=zi[None, :])
+
+    return y, x[-1].copy(), y[-1].copy()
+
+
+def lp_filter_block(input_signal, dt, corner_freq, prev_input, prev_output):
+    """
+    Apply the bilinear-transform low-pass difference equation to a whole block.
+
+    Produces the same samples as calling the scalar filter once per sample, but
+    the recursion runs inside scipy.signal.lfilter instead of the interpreter.
+
+    Parameters:
+    - input_signal (array): Samples, shape (n_samples,) or (n_samples, n_channels)
+    - dt (float): Time step [seconds]
+    - corner_freq (float or array): Corner frequency [rad/s], scalar or one per channel
+    - prev_input (float or array): Input sample preceding the block, per channel
+    - prev_output (float or array): Output sample preceding the block, per channel
+
+    Returns:
+    - output (array): Filtered block, same shape as input_signal
+    - last_input (float or array): Last input sample of the block, per channel
+    - last_output (float or array): Last output sample of the block, per channel
+    """
+    x = np.asarray(input_signal, dtype=float)
+    one_d = x.ndim == 1
+    if one_d:
+        x = x[:, None]
+    n_channels = x.shape[1]
+
+    y, x_end, y_end = _lp_filter_2d(
+        x,
+        np.broadcast_to(np.asarray(corner_freq, dtype=float) * dt, (n_channels,)),
+        np.broadcast_to(np.asarray(prev_input, dtype=float), (n_channels,)),
+        np.broadcast_to(np.asarray(prev_output, dtype=float), (n_channels,)))
+
+    if one_d:
+        return y[:, 0], float(x_end[0]), float(y_end[0])
+    return y, x_end, y_end
 
 class LowPassFilter:
     def __init__(self):
@@ -52,27 +106,299 @@ class LowPassFilter:
 
         return output
 
-def plot_frequency_response(dt, corner_freq):
-    # Frequency points for response
-    freqs = np.logspace(-1, 2, 500)  # 0.1 to 100 Hz
-    w = 2 * np.pi * freqs  # Angular frequency [rad/s]
-    
+    def lp_filter_array(self, input_signal, dt, corner_freq, instance=0, i_status=0, reset=False, initial_value=None):
+        """
+        Vectorized version of lp_filter for a block of samples and channels.
+
+        The state of `instance` is carried between calls exactly as with
+        lp_filter, so blocks can be mixed freely with per-sample calls.
+
+        Parameters:
+        - input_signal (array): Samples, shape (n_samples,) or (n_samples, n_channels)
+        - dt (float): Time step [seconds]
+        - corner_freq (float or array): Corner frequency [rad/s], scalar or one per channel
+        - instance (int): Instance number for multiple filters
+        - i_status (int): Simulation status of the first sample (0: first call, 1: subsequent, -1: final)
+        - reset (bool): Reset filter to initial value before the first sample
+        - initial_value (float or array, optional): Value to set when resetting,
+          defaults to the first sample of each channel
+
+        Returns:
+        - filtered output (array), same shape as input_signal
+        """
+        x = np.asarray(input_signal, dtype=float)
+        one_d = x.ndim == 1
+        if one_d:
+            x = x[:, None]
+        n_channels = x.shape[1]
+
+        def per_channel(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (n_channels,))
+
+        # Initialization or reset
+        if i_status == 0 or reset:
+            initial_value = x[0] if initial_value is None else per_channel(initial_value)
+            wdt = per_channel(corner_freq) * dt
+            self.output_signal_last[instance] = initial_value
+            self.input_signal_last[instance] = initial_value
+            self.a1[instance] = 2 + wdt
+            self.a0[instance] = wdt - 2
+            self.b1[instance] = wdt
+            self.b0[instance] = wdt
+
+        # The stored coefficients define the filter, as in lp_filter
+        output, last_input, last_output = _lp_filter_2d(
+            x, per_channel(self.b1[instance]),
+            per_channel(self.input_signal_last[instance]),
+            per_channel(self.output_signal_last[instance]))
+
+        # Update states for next call (plain floats for a single channel, like lp_filter)
+        if one_d:
+            output = output[:, 0]
+            for store in (self.a1, self.a0, self.b1, self.b0):
+                store[instance] = float(per_channel(store[instance])[0])
+            last_input, last_output = float(last_input[0]), float(last_output[0])
+        self.input_signal_last[instance] = last_input
+        self.output_signal_last[instance] = last_output
+
+        return output
+
+    def lp_filter_stream(self, chunks, dt, corner_freq, instance=0, i_status=0, reset=False, initial_value=None):
+        """
+        Filter an iterable of signal chunks, yielding one filtered chunk per input chunk.
+
+        The prev_input/prev_output state is carried across chunk boundaries, so
+        the concatenated output equals filtering the whole signal at once while
+        only one chunk is held in memory.
+
+        Parameters:
+        - chunks (iterable of arrays): Blocks of shape (n_samples,) or (n_samples, n_channels)
+        - dt (float): Time step [seconds]
+        - corner_freq (float or array): Corner frequency [rad/s], scalar or one per channel
+        - instance (int): Instance number for multiple filters
+        - i_status (int): Simulation status of the first sample (0: first call, 1: subsequent)
+        - reset (bool): Reset filter to initial value before the first sample
+        - initial_value (float or array, optional): Value to set when resetting
+
+        Yields:
+        - filtered chunk (array), same shape as the input chunk
+        """
+        first = True
+        for chunk in chunks:
+            chunk = np.asarray(chunk, dtype=float)
+            if len(chunk) == 0:
+                yield chunk
+                continue
+            if first:
+                yield self.lp_filter_array(chunk, dt, corner_freq, instance, i_status, reset, initial_value)
+                first = False
+            else:
+                yield self.lp_filter_array(chunk, dt, corner_freq, instance, i_status=1)
+
+class LowPassFilterBank:
+    """
+    Many LowPassFilter instances stepped together.
+
+    Coefficients and states are kept in contiguous arrays (one element per
+    instance) instead of dicts, and step() advances every instance at once
+    with the same difference equation as LowPassFilter.lp_filter.
+    """
+    def __init__(self, n_instances, dt, corner_freq):
+        """
+        Parameters:
+        - n_instances (int or tuple): Number (or array shape) of filter instances
+        - dt (float): Time step [seconds]
+        - corner_freq (float or array): Corner frequency [rad/s], scalar or one per instance
+        """
+        wdt = np.broadcast_to(np.asarray(corner_freq, dtype=float) * dt, n_instances)
+        self.dt = dt
+        self.a1 = 2 + wdt
+        self.a0 = wdt - 2
+        self.b1 = wdt.copy()
+        self.b0 = wdt.copy()
+        self.output_signal_last = np.zeros(wdt.shape)
+        self.input_signal_last = np.zeros(wdt.shape)
+        # Instances still waiting for their first call (i_status == 0)
+        self.pending = np.ones(wdt.shape, dtype=bool)
+
+    def reset(self, index=None, initial_value=None):
+        """
+        Reset a subset of instances.
+
+        Parameters:
+        - index (array-like, optional): Instance indices or boolean mask, all instances if None
+        - initial_value (float or array, optional): Value to reset to; if None the
+          instances are re-initialized from their next input, like i_status == 0
+        """
+        index = slice(None) if index is None else index
+        if initial_value is None:
+            self.pending[index] = True
+        else:
+            self.output_signal_last[index] = initial_value
+            self.input_signal_last[index] = initial_value
+            self.pending[index] = False
+
+    def step(self, inputs):
+        """
+        Advance every instance by one time step.
+
+        Parameters:
+        - inputs (array): Current input value of each instance
+
+        Returns:
+        - filtered output (array), one value per instance
+        """
+        inputs = np.asarray(inputs, dtype=float)
+
+        # First call after construction or reset: start from the input itself
+        if self.pending.any():
+            self.output_signal_last[self.pending] = inputs[self.pending]
+            self.input_signal_last[self.pending] = inputs[self.pending]
+            self.pending[:] = False
+
+        # Compute filter output using the difference equation
+        output = (1.0 / self.a1) * (
+            -self.a0 * self.output_signal_last +
+            self.b1 * inputs +
+            self.b0 * self.input_signal_last
+        )
+
+        # Update states for next time step
+        self.input_signal_last[...] = inputs
+        self.output_signal_last[...] = output
+
+        return output
+
+def iter_parquet_chunks(path, columns=None, batch_size=None):
+    """
+    Read a Parquet file (e.g. the fast_output.parquet cache) one block at a time.
+
+    Parameters:
+    - path (str): Parquet file
+    - columns (list of str, optional): Columns to read, all columns if None
+    - batch_size (int, optional): Rows per block, one row group per block if None
+
+    Yields:
+    - block (array), shape (n_rows, n_columns)
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    if batch_size is None:
+        batches = (parquet_file.read_row_group(i, columns=columns)
+                   for i in range(parquet_file.num_row_groups))
+    else:
+        batches = parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+    for batch in batches:
+        yield np.column_stack([column.to_numpy(zero_copy_only=False).astype(float)
+                               for column in batch.columns])
+
+
+def parquet_column_ranges(path, columns=None):
+    """
+    (min, max) of every column from the Parquet row-group statistics, without reading the data.
+
+    With these as StreamingStats' hist_range, a single pass over iter_parquet_chunks
+    gives the same bins as np.histogram(column, bins) on the whole column.
+
+    Parameters:
+    - path (str): Parquet file
+    - columns (list of str, optional): Columns, all columns if None
+
+    Returns:
+    - array (n_columns, 2), or None when the file was written without statistics
+    """
+    import pyarrow.parquet as pq
+
+    metadata = pq.ParquetFile(path).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    columns = names if columns is None else list(columns)
+    ranges = np.array([[np.inf, -np.inf]] * len(columns))
+    for g in range(metadata.num_row_groups):
+        row_group = metadata.row_group(g)
+        for j, name in enumerate(columns):
+            stats = row_group.column(names.index(name)).statistics
+            if stats is None:
+                return None
+            if stats.has_min_max:  # Written but without min/max: only nulls and NaN
+                ranges[j] = min(ranges[j, 0], float(stats.min)), max(ranges[j, 1], float(stats.max))
+    # Columns without any values get an arbitrary (0, 1) range, as in StreamingStats
+    empty = ranges[:, 0] > ranges[:, 1]
+    ranges[empty] = 0.0, 1.0
+    return ranges
+
+def filter_frequency_response(dt, corner_freq, freqs=None, eval_freqs=None):
+    """
+    Frequency response of the discrete low-pass filter for many designs at once.
+
+    dt and corner_freq are broadcast against each other, so a full grid is
+    obtained with e.g. dt[:, None] and corner_freq[None, :]. No plotting is done.
+
+    Parameters:
+    - dt (float or array): Time step(s) [seconds]
+    - corner_freq (float or array): Corner frequency(ies) [rad/s]
+    - freqs (array, optional): Evaluation frequencies [Hz], 0.1 to 100 Hz by default
+    - eval_freqs (array, optional): Frequencies [Hz] at which to report the phase lag
+
+    Returns:
+    - dict with
+      freqs (n_freqs,) [Hz],
+      magnitude, magnitude_db, phase [rad], group_delay [s], each of shape design_shape + (n_freqs,),
+      f_3db (design_shape) actual -3 dB frequency of the discrete filter [Hz],
+      phase_lag (design_shape + (n_eval,)) phase lag at eval_freqs [deg], if eval_freqs is given
+    """
+    freqs = np.logspace(-1, 2, 500) if freqs is None else np.asarray(freqs, dtype=float)
+    dt, corner_freq = np.broadcast_arrays(np.asarray(dt, dtype=float), np.asarray(corner_freq, dtype=float))
+    dt_, wc = dt[..., None], corner_freq[..., None]
+
     # Filter coefficients
-    a1 = 2 + corner_freq * dt
-    a0 = corner_freq * dt - 2
-    b1 = corner_freq * dt
-    b0 = corner_freq * dt
-    
-    # Compute frequency response H(e^jw)
-    H = np.zeros(len(w), dtype=complex)
-    for i, omega in enumerate(w):
-        z = np.exp(1j * omega * dt)  # e^(jωT)
-        H[i] = (b1 * z + b0) / (a1 * z + a0)
-    
+    a1 = 2 + wc * dt_
+    a0 = wc * dt_ - 2
+    b1 = wc * dt_
+    b0 = wc * dt_
+
+    # Compute frequency response H(e^jwT) on the whole (design, frequency) grid
+    wT = 2 * np.pi * freqs * dt_
+    z = np.exp(1j * wT)
+    H = (b1 * z + b0) / (a1 * z + a0)
+
+    # Group delay of a first-order section: -d(arg H)/dw; the numerator (b1 = b0)
+    # contributes a constant T/2
+    cos_wT = np.cos(wT)
+    group_delay = dt_ * ((a1**2 + a1 * a0 * cos_wT) / (a1**2 + a0**2 + 2 * a1 * a0 * cos_wT) - 0.5)
+
+    response = {
+        'freqs': freqs,
+        'magnitude': np.abs(H),
+        'magnitude_db': 20 * np.log10(np.abs(H)),
+        'phase': np.angle(H),
+        'group_delay': group_delay,
+        # Bilinear transform maps the analog corner wc to (2/T) * atan(wc T / 2)
+        'f_3db': (2 / dt) * np.arctan(corner_freq * dt / 2) / (2 * np.pi),
+    }
+
+    if eval_freqs is not None:
+        z_eval = np.exp(1j * 2 * np.pi * np.asarray(eval_freqs, dtype=float) * dt_)
+        response['phase_lag'] = -np.degrees(np.angle((b1 * z_eval + b0) / (a1 * z_eval + a0)))
+
+    return response
+
+def plot_frequency_response(dt, corner_freq, response=None):
+    """Plot the magnitude response(s) returned by filter_frequency_response."""
+    if response is None:
+        response = filter_frequency_response(dt, corner_freq)
+    freqs = response['freqs']
+    magnitude_db = response['magnitude_db'].reshape(-1, len(freqs))
+    corner_freqs = np.broadcast_to(corner_freq, response['f_3db'].shape).ravel()
+
     # Plot magnitude response
     plt.figure(figsize=(10, 6))
-    plt.semilogx(freqs, 20 * np.log10(np.abs(H)), label='Frequency Response')
-    plt.axvline(corner_freq / (2 * np.pi), color='r', linestyle='--', label='Corner Frequency')
+    for i, mag in enumerate(magnitude_db):
+        label = 'Frequency Response' if len(magnitude_db) == 1 else f'wc = {corner_freqs[i]:g} rad/s'
+        plt.semilogx(freqs, mag, label=label)
+    for i, wc in enumerate(np.unique(corner_freqs)):
+        plt.axvline(wc / (2 * np.pi), color='r', linestyle='--', label='Corner Frequency' if i == 0 else None)
     plt.xlabel('Frequency (Hz)')
     plt.ylabel('Magnitude (dB)')
     plt.title('Low-Pass Filter Frequency Response')
@@ -95,11 +421,8 @@ def main():
     # Initialize filter
     lpf = LowPassFilter()
     
-    # Apply filter to the signal
-    filtered_signal = np.zeros_like(signal)
-    for i, x in enumerate(signal):
-        i_status = 0 if i == 0 else 1  # First call: i_status = 0
-        filtered_signal[i] = lpf.lp_filter(x, dt, corner_freq, instance=0, i_status=i_status)
+    # Apply filter to the whole signal in one call (first sample: i_status = 0)
+    filtered_signal = lpf.lp_filter_array(signal, dt, corner_freq, instance=0, i_status=0)
     
     # Plot time-domain results
     plt.figure(figsize=(10, 6))
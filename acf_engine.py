@@ -0,0 +1,284 @@
+"""
+Batched ACF / PACF for every channel of a 2-D array.
+
+The autocovariances of all columns come from one zero-padded real FFT; the ACF
+is their normalization and the Yule-Walker PACF is read off the Levinson-Durbin
+recursion run on the same autocovariances, vectorized across columns. Results
+match statsmodels acf and pacf(method='yw' / 'ywm') including the confidence
+bands (Bartlett's formula for the ACF, 1/n for the PACF).
+
+StreamingStats computes the same statistics, plus fixed-bin histograms and
+running moments, in one pass over chunks that need not fit in memory.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy.stats import norm
+
+
+def autocovariance(x, nlags, adjusted=False, demean=True):
+    """
+    Autocovariances of every column at lags 0..nlags via FFT.
+
+    Parameters:
+    - x (array): Series, (n,) or (n, n_columns)
+    - nlags (int): Largest lag
+    - adjusted (bool): Divide lag k by n-k instead of n
+    - demean (bool): Subtract the column means first
+
+    Returns:
+    - autocovariances (nlags+1, n_columns)
+    """
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    n = x.shape[0]
+    if demean:
+        x = x - x.mean(axis=0)
+    nfft = sp_fft.next_fast_len(2 * n - 1, real=True)
+    spec = sp_fft.rfft(x, n=nfft, axis=0)
+    acov = sp_fft.irfft(spec.real**2 + spec.imag**2, n=nfft, axis=0)[:nlags + 1]
+    if adjusted:
+        acov /= (n - np.arange(nlags + 1))[:, None]
+    else:
+        acov /= n
+    return acov
+
+
+def levinson_durbin(acov, nlags=None):
+    """
+    Partial autocorrelations from autocovariances, vectorized across columns.
+
+    Parameters:
+    - acov (array): Autocovariances at lags 0..nlags, (nlags+1, n_columns)
+    - nlags (int, optional): Largest lag, len(acov)-1 by default
+
+    Returns:
+    - pacf (nlags+1, n_columns), with pacf[0] = 1
+    """
+    acov = np.asarray(acov, dtype=float)
+    if acov.ndim == 1:
+        acov = acov[:, None]
+    nlags = len(acov) - 1 if nlags is None else nlags
+    n_columns = acov.shape[1]
+
+    pacf = np.ones((nlags + 1, n_columns))
+    phi = np.zeros((nlags, n_columns))
+    sigma = acov[0].copy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for m in range(1, nlags + 1):
+            # phi[:m-1] holds the order m-1 coefficients
+            kappa = (acov[m] - np.einsum('ij,ij->j', phi[:m - 1], acov[m - 1:0:-1])) / sigma
+            if m > 1:
+                phi[:m - 1] = phi[:m - 1] - kappa * phi[m - 2::-1]
+            phi[m - 1] = kappa
+            sigma = sigma * (1 - kappa**2)
+            pacf[m] = kappa
+    return pacf
+
+
+def _acf_pacf_block(x, nlags, pacf_method):
+    acov = autocovariance(x, nlags)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acf = acov / acov[0]
+    if pacf_method == 'yw':
+        acov = acov * (x.shape[0] / (x.shape[0] - np.arange(nlags + 1)))[:, None]
+    return acf, levinson_durbin(acov, nlags)
+
+
+def acf_pacf(x, nlags=40, alpha=0.05, pacf_method='yw', n_workers=None, block_columns=64):
+    """
+    ACF, Yule-Walker PACF and their confidence bands for every column of x.
+
+    Parameters:
+    - x (array or DataFrame): Series, (n,) or (n, n_columns)
+    - nlags (int): Largest lag, must be below n // 2 for the PACF
+    - alpha (float, optional): Confidence level of the bands, None to skip them
+    - pacf_method (str): 'yw' (adjusted autocovariances, statsmodels default) or 'ywm' (biased)
+    - n_workers (int, optional): Threads over column blocks, os.cpu_count() by default
+    - block_columns (int): Columns per block
+
+    Returns:
+    - dict with 'acf' and 'pacf' (nlags+1, n_columns) and, when alpha is given,
+      'acf_confint' and 'pacf_confint' (nlags+1, n_columns, 2)
+    """
+    if pacf_method not in ('yw', 'ywm'):
+        raise ValueError(f"Unknown pacf_method {pacf_method!r}, expected 'yw' or 'ywm'")
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+    n, n_columns = x.shape
+    if nlags >= n // 2:
+        raise ValueError(f"nlags must be < {n // 2} for a series of length {n}")
+
+    blocks = [x[:, start:start + block_columns] for start in range(0, n_columns, block_columns)]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(blocks))
+    if n_workers > 1:
+        # The FFTs and reductions release the GIL, so threads scale without copying x
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(lambda b: _acf_pacf_block(b, nlags, pacf_method), blocks))
+    else:
+        parts = [_acf_pacf_block(b, nlags, pacf_method) for b in blocks]
+    acf = np.concatenate([p[0] for p in parts], axis=1)
+    pacf = np.concatenate([p[1] for p in parts], axis=1)
+
+    result = {'acf': acf, 'pacf': pacf}
+    if alpha is not None:
+        result.update(_confint(acf, pacf, n, alpha))
+    return result
+
+
+def _confint(acf, pacf, n, alpha):
+    z = norm.ppf(1.0 - alpha / 2.0)
+    # Bartlett's formula: var(r_k) = (1 + 2 sum_{j<k} r_j^2) / n
+    var_acf = np.ones_like(acf) / n
+    var_acf[0] = 0
+    var_acf[2:] *= 1 + 2 * np.cumsum(acf[1:-1]**2, axis=0)
+    half = z * np.sqrt(var_acf)
+    confint = {'acf_confint': np.stack([acf - half, acf + half], axis=-1)}
+
+    half = np.full_like(pacf, z / np.sqrt(n))
+    half[0] = 0
+    confint['pacf_confint'] = np.stack([pacf - half, pacf + half], axis=-1)
+    return confint
+
+
+class StreamingStats:
+    """
+    Single-pass histograms, moments and ACF/PACF over a stream of chunks.
+
+    Memory is bounded by the nlags most recent rows (to carry lagged products
+    across chunk boundaries) plus the nlags first rows (to correct the sums for
+    the mean, which is only known at the end). Sums are taken about the mean of
+    the first chunk to avoid cancellation. The result equals acf_pacf and
+    np.histogram(..., range=hist_range) on the concatenated data.
+
+    The bins cannot move once counted, so the histogram range is fixed up front:
+    hist_range when given (e.g. the column min/max from Parquet statistics, which
+    reproduces np.histogram(x, bins)), else each column's range in the first chunk.
+    Values outside the range are counted in underflow / overflow.
+
+    Parameters:
+    - nlags (int): Largest ACF/PACF lag
+    - bins (int): Histogram bins
+    - hist_range (tuple, optional): (min, max) of the histogram; a (n_columns, 2) array
+      gives one range per column
+    """
+    def __init__(self, nlags=40, bins=20, hist_range=None):
+        self.nlags = nlags
+        self.bins = bins
+        self.hist_range = hist_range
+        self.columns = None
+        self.n = 0
+        self.shift = None
+
+    def _start(self, chunk):
+        n_columns = chunk.shape[1]
+        self.shift = chunk.mean(axis=0)
+        self.sum = np.zeros(n_columns)
+        self.sum_sq = np.zeros(n_columns)
+        self.lag_products = np.zeros((self.nlags + 1, n_columns))
+        self.head = np.empty((0, n_columns))
+        self.tail = np.empty((0, n_columns))
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+        if self.hist_range is None:
+            valid = ~np.isnan(chunk)
+            low = np.where(valid, chunk, np.inf).min(axis=0)
+            high = np.where(valid, chunk, -np.inf).max(axis=0)
+            # A column without values in the first chunk gets an arbitrary (0, 1) range
+            empty = ~valid.any(axis=0)
+            ranges = np.column_stack([np.where(empty, 0.0, low), np.where(empty, 1.0, high)])
+        else:
+            ranges = np.broadcast_to(np.asarray(self.hist_range, dtype=float), (n_columns, 2))
+        self.edges = [np.histogram_bin_edges([], bins=self.bins, range=tuple(r)) for r in ranges]
+        self.counts = np.zeros((self.bins, n_columns), dtype=np.int64)
+        self.underflow = np.zeros(n_columns, dtype=np.int64)
+        self.overflow = np.zeros(n_columns, dtype=np.int64)
+
+    def update(self, chunk):
+        """
+        Accumulate one chunk.
+
+        Parameters:
+        - chunk (array or DataFrame): Next rows, (m,) or (m, n_columns); a DataFrame's
+          columns are remembered for the result
+        """
+        if hasattr(chunk, 'columns') and self.columns is None:
+            self.columns = list(chunk.columns)
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        if len(chunk) == 0:
+            return
+        if self.shift is None:
+            self._start(chunk)
+
+        y = chunk - self.shift
+        m = len(y)
+        self.sum += y.sum(axis=0)
+        self.sum_sq += np.einsum('ij,ij->j', y, y)
+        self.min = np.minimum(self.min, chunk.min(axis=0))
+        self.max = np.maximum(self.max, chunk.max(axis=0))
+        for j, edges in enumerate(self.edges):
+            self.counts[:, j] += np.histogram(chunk[:, j], bins=edges)[0]
+        self.underflow += (chunk < [e[0] for e in self.edges]).sum(axis=0)
+        self.overflow += (chunk > [e[-1] for e in self.edges]).sum(axis=0)
+
+        # Products y[t] * y[t+k] whose later element lies in this chunk
+        z = np.concatenate([self.tail, y])
+        L = len(self.tail)
+        for k in range(self.nlags + 1):
+            first = max(L, k)
+            if first < L + m:
+                self.lag_products[k] += np.einsum('ij,ij->j', z[first - k:L + m - k], z[first:L + m])
+
+        if len(self.head) < self.nlags:
+            self.head = np.concatenate([self.head, y[:self.nlags - len(self.head)]])
+        self.tail = z[-self.nlags:] if self.nlags else z[:0]
+        self.n += m
+
+    def result(self, alpha=0.05, pacf_method='yw'):
+        """
+        Statistics of everything seen so far.
+
+        Parameters:
+        - alpha (float, optional): Confidence level of the ACF/PACF bands, None to skip them
+        - pacf_method (str): 'yw' or 'ywm', see acf_pacf
+
+        Returns:
+        - dict with 'n', 'mean', 'std' (population), 'min', 'max', 'acov', 'acf', 'pacf',
+          the confidence bands as in acf_pacf, 'histogram' ((bins, n_columns) counts),
+          'bin_edges' (one array per column), 'underflow' and 'overflow' (counts outside
+          the bins, per column) and 'columns' for DataFrame input
+        """
+        if pacf_method not in ('yw', 'ywm'):
+            raise ValueError(f"Unknown pacf_method {pacf_method!r}, expected 'yw' or 'ywm'")
+        n, nlags = self.n, self.nlags
+        if nlags >= n // 2:
+            raise ValueError(f"nlags must be < {n // 2} for a series of length {n}")
+
+        mean = self.sum / n
+        lags = np.arange(nlags + 1)
+        head_sums = np.vstack([np.zeros_like(mean), np.cumsum(self.head, axis=0)])[:nlags + 1]
+        tail_sums = np.vstack([np.zeros_like(mean), np.cumsum(self.tail[::-1], axis=0)])[:nlags + 1]
+        # sum_{t<n-k} (y_t - mean)(y_{t+k} - mean), expanded so only running sums are needed
+        acov = (self.lag_products - mean * (2 * self.sum - head_sums - tail_sums)
+                + (n - lags)[:, None] * mean**2) / n
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            acf = acov / acov[0]
+        pacf_acov = acov * (n / (n - lags))[:, None] if pacf_method == 'yw' else acov
+        pacf = levinson_durbin(pacf_acov, nlags)
+
+        result = {'n': n, 'mean': mean + self.shift, 'std': np.sqrt(np.maximum(self.sum_sq / n - mean**2, 0)),
+                  'min': self.min, 'max': self.max, 'acov': acov, 'acf': acf, 'pacf': pacf}
+        if alpha is not None:
+            result.update(_confint(acf, pacf, n, alpha))
+        result.update(histogram=self.counts, bin_edges=self.edges, underflow=self.underflow,
+                      overflow=self.overflow)
+        if self.columns is not None:
+            result['columns'] = self.columns
+        return result
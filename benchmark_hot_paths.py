@@ -0,0 +1,382 @@
+"""
+Benchmark suite for the filter, feature, loader, ACF/PACF, waveform and simulation hot paths.
+
+Every benchmark runs on seeded synthetic data at each (samples, channels)
+size and reports the best wall time of --repeat runs, the throughput in data
+elements (samples x channels) per second and the peak memory allocated during
+one run (tracemalloc). Per-sample Python loops are capped at
+--max-loop-elements and every benchmark at --max-elements (samples x
+channels), so large sizes stay practical; every case skipped by a cap is
+printed with the reason. Results can be saved as a baseline and later runs
+compared against it; a run slower or hungrier than the baseline by more than
+the thresholds, or a selected baseline case (within --only, --sizes and
+--channels) that did not run, is reported and the script exits with status 1.
+
+Timings only compare on the same machine and environment, so no baseline is
+kept in the repository. Record one on the reference commit with the first
+usage line below, then check later commits against it with the second (the
+same --sizes / --channels / caps, or a subset of them).
+
+Everything runs offline: the simulation uses the NREL 5MW Cq table shipped in
+this repository and a local stub controller.
+
+Usage:
+    python benchmark_hot_paths.py --save-baseline bench_baseline.json
+    python benchmark_hot_paths.py --baseline bench_baseline.json
+    python benchmark_hot_paths.py --sizes 1e4 1e6 1e8 --channels 1 --max-elements 1e8 --only lpf_array acf_pacf
+    python benchmark_hot_paths.py --sizes 1e4 1e6 --channels 1 200 --max-elements 2e8 --only lpf_array acf_pacf
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from LPF import LowPassFilter
+from lp_filter import lp_filter, lp_filter_array
+from generate_lagged_dataset import generate_lagged_dataset
+from fast_loader import load_fast_run
+from acf_engine import acf_pacf
+from rotor_performance import load_rotor_performance
+from untitled10 import sim_ws_wd_series
+
+DT = 0.01
+CORNER_FREQ = 0.17952
+
+
+def _load_step_waveform():
+    # The file name has spaces, so it cannot be imported by name
+    path = os.path.join(HERE, 'Create a step waveform and its shifted version.py')
+    spec = importlib.util.spec_from_file_location('step_waveform', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.create_step_waveform
+
+
+def _signals(n_samples, n_channels, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) * DT
+    return np.sin(2 * np.pi * 0.01 * t)[:, None] + 0.5 * rng.standard_normal((n_samples, n_channels))
+
+
+# Benchmarks: setup(n_samples, n_channels, tmp_dir) -> run callable.
+# Setup is not timed.
+
+def bench_lpf_scalar(n_samples, n_channels, tmp_dir):
+    x = _signals(n_samples, n_channels)
+
+    def run():
+        lpf = LowPassFilter()
+        for j in range(n_channels):
+            lpf.lp_filter(x[0, j], DT, CORNER_FREQ, instance=j, i_status=0)
+        for i in range(1, n_samples):
+            for j in range(n_channels):
+                lpf.lp_filter(x[i, j], DT, CORNER_FREQ, instance=j, i_status=1)
+    return run
+
+
+def bench_lpf_array(n_samples, n_channels, tmp_dir):
+    x = _signals(n_samples, n_channels)
+    return lambda: LowPassFilter().lp_filter_array(x, DT, CORNER_FREQ)
+
+
+def bench_lp_filter_scalar(n_samples, n_channels, tmp_dir):
+    x = _signals(n_samples, n_channels)
+
+    def run():
+        for j in range(n_channels):
+            prev_in = prev_out = x[0, j]
+            for i in range(n_samples):
+                _, prev_in, prev_out = lp_filter(x[i, j], DT, CORNER_FREQ, prev_in, prev_out)
+    return run
+
+
+def bench_lp_filter_array(n_samples, n_channels, tmp_dir):
+    x = _signals(n_samples, n_channels)
+    return lambda: lp_filter_array(x, DT, CORNER_FREQ, x[0], x[0])
+
+
+def bench_lagged_dataset(n_samples, n_channels, tmp_dir):
+    features = [f"X{j}" for j in range(n_channels)]
+    df = pd.DataFrame(_signals(n_samples, n_channels), columns=features)
+    df.insert(0, 'Time', np.arange(n_samples) * DT)
+    df['Target'] = df[features].sum(axis=1)
+    return lambda: generate_lagged_dataset(df, features, 'Target', num_lags=5)
+
+
+def _run_frames(n_samples, n_channels):
+    fast = pd.DataFrame(_signals(n_samples, n_channels), columns=[f"F{j}" for j in range(n_channels)])
+    fast.insert(0, 'Time', np.arange(n_samples) * DT)
+    debug = pd.DataFrame(_signals(n_samples, n_channels, seed=1), columns=[f"D{j}" for j in range(n_channels)])
+    debug.insert(0, 'Time', np.arange(n_samples) * DT + DT / 3)
+    return fast, debug
+
+
+def bench_loader_parquet(n_samples, n_channels, tmp_dir):
+    fast, debug = _run_frames(n_samples, n_channels)
+    path = os.path.join(tmp_dir, f"run_{n_samples}_{n_channels}.parquet")
+    pd.concat([fast, debug.drop(columns='Time')], axis=1).to_parquet(path, index=False)
+    return lambda: load_fast_run(path)
+
+
+def bench_loader_excel(n_samples, n_channels, tmp_dir):
+    fast, debug = _run_frames(n_samples, n_channels)
+    path = os.path.join(tmp_dir, f"run_{n_samples}_{n_channels}.xlsx")
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        fast.to_excel(writer, sheet_name='FAST_Output', index=False)
+        debug.to_excel(writer, sheet_name='Debug_Output', index=False)
+    return lambda: load_fast_run(path)
+
+
+def bench_acf_pacf(n_samples, n_channels, tmp_dir):
+    x = _signals(n_samples, n_channels)
+    return lambda: acf_pacf(x, nlags=50)
+
+
+def bench_step_waveform(n_samples, n_channels, tmp_dir):
+    create_step_waveform = _load_step_waveform()
+    t = np.arange(n_samples) * DT
+    # n_channels sets the number of steps, spread over the horizon
+    step_times = np.linspace(0, t[-1], 10 * n_channels + 1)
+    steps = np.arange(len(step_times) - 1, dtype=float)
+    return lambda: create_step_waveform(t, steps, step_times, shift=-5 * DT, plot=False)
+
+
+class StubTurbine:
+    """NREL 5MW parameters used by sim_ws_wd_series, with the Cq table of this repository."""
+    rotor_radius = 63.0
+    Ng = 97.0
+    J = 4.0469e7
+    GenEff = 94.4
+    rho = 1.225
+
+    def __init__(self):
+        table = load_rotor_performance(os.path.join(HERE, 'Cp_Ct_Cq.NREL5MW.txt'))
+        self.Cq = table.surface('Cq')
+
+
+class StubController:
+    """Local stand-in for a compiled controller: k*omega^2 torque, PI pitch, bang-bang yaw."""
+    def __init__(self):
+        self.integral = 0.0
+
+    def call_controller(self, turbine_state):
+        gen_torque = min(2.3323 * turbine_state['gen_speed']**2, 43093.55)
+        error = turbine_state['gen_speed'] - 122.9
+        self.integral += error * turbine_state['dt']
+        bld_pitch = max(0.0, 0.01 * error + 0.001 * self.integral)
+        yaw_rate = 0.005 * np.sign(turbine_state['Y_MeasErr']) if abs(turbine_state['Y_MeasErr']) > 0.1 else 0.0
+        return gen_torque, bld_pitch, yaw_rate
+
+    def kill_discon(self):
+        pass
+
+
+class StubSim:
+    def __init__(self, turbine):
+        self.turbine = turbine
+        self.controller_int = StubController()
+
+
+def bench_sim(n_samples, n_channels, tmp_dir):
+    turbine = StubTurbine()
+    rng = np.random.default_rng(0)
+    t = np.arange(n_samples) * DT
+    ws = 12 + np.cumsum(rng.normal(0, 0.02, n_samples))
+    wd = np.where(t > t[-1] / 3, 15.0, 0.0)
+
+    def run():
+        sim_ws_wd_series(StubSim(turbine), t, ws, wd, make_plots=False, verbose=False)
+    return run
+
+
+# name: (setup, per-sample Python loop, meaning of channels, minimum samples)
+# Channels are 'data' columns (counted in the throughput), 'steps' (step count, not counted)
+# or None (single-channel benchmark)
+BENCHMARKS = {
+    'lpf_scalar': (bench_lpf_scalar, True, 'data', 2),
+    'lpf_array': (bench_lpf_array, False, 'data', 2),
+    'lp_filter_scalar': (bench_lp_filter_scalar, True, 'data', 2),
+    'lp_filter_array': (bench_lp_filter_array, False, 'data', 2),
+    'lagged_dataset': (bench_lagged_dataset, False, 'data', 10),
+    'loader_parquet': (bench_loader_parquet, False, 'data', 2),
+    'loader_excel': (bench_loader_excel, True, 'data', 2),
+    'acf_pacf': (bench_acf_pacf, False, 'data', 102),
+    'step_waveform': (bench_step_waveform, False, 'steps', 2),
+    'sim_ws_wd_series': (bench_sim, True, None, 2),
+}
+
+
+def measure(run, repeat):
+    """Best wall time of repeat runs, and peak traced memory (bytes) of one extra run."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        tic = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - tic)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_suite(names, sizes, channels, repeat=3, max_loop_elements=100000, max_elements=5 * 10**7, verbose=True):
+    """
+    Run the selected benchmarks at every size.
+
+    Parameters:
+    - names (list of str): Keys of BENCHMARKS
+    - sizes (list of int): Sample counts
+    - channels (list of int): Channel counts (step counts for step_waveform, ignored by
+      single-channel benchmarks)
+    - repeat (int): Timed runs per case, the best is kept
+    - max_loop_elements (int): Largest samples x channels for per-sample Python loops
+    - max_elements (int): Largest samples x channels for any benchmark
+    - verbose (bool): Print every result and skipped case as it comes
+
+    Returns:
+    - list of result dicts: benchmark, samples, channels, seconds, throughput (data
+      elements per second), peak_mb
+    - list of skipped cases: benchmark, samples, channels, reason
+    """
+    results, skipped = [], []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in names:
+            setup, is_loop, channel_mode, min_samples = BENCHMARKS[name]
+            for n_samples in sizes:
+                for n_channels in (channels if channel_mode else [1]):
+                    elements = n_samples * n_channels if channel_mode == 'data' else n_samples
+                    reason = None
+                    if n_samples < min_samples:
+                        reason = f"needs at least {min_samples} samples"
+                    elif is_loop and elements > max_loop_elements:
+                        reason = f"{elements:.3g} elements > --max-loop-elements {max_loop_elements:.3g}"
+                    elif elements > max_elements:
+                        reason = f"{elements:.3g} elements > --max-elements {max_elements:.3g}"
+                    if reason is not None:
+                        skipped.append({'benchmark': name, 'samples': n_samples, 'channels': n_channels,
+                                        'reason': reason})
+                        if verbose:
+                            print(f"{name:18s} {n_samples:>11,d} x {n_channels:<4d} skipped: {reason}", flush=True)
+                        continue
+                    seconds, peak = measure(setup(n_samples, n_channels, tmp_dir), repeat)
+                    result = {'benchmark': name, 'samples': n_samples, 'channels': n_channels,
+                              'seconds': seconds, 'throughput': elements / seconds, 'peak_mb': peak / 1024**2}
+                    results.append(result)
+                    if verbose:
+                        print(f"{name:18s} {n_samples:>11,d} x {n_channels:<4d} {seconds:10.4f} s "
+                              f"{result['throughput']:14,.0f} /s {result['peak_mb']:10.1f} MB", flush=True)
+    return results, skipped
+
+
+def environment():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'machine': platform.machine(), 'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+
+def compare(results, baseline, time_threshold=0.25, memory_threshold=0.25, min_seconds=0.005, selection=None):
+    """
+    Compare results with a baseline run.
+
+    Parameters:
+    - results (list of dict): Output of run_suite
+    - baseline (dict): Saved baseline, {'environment': ..., 'results': [...]}
+    - time_threshold (float): Allowed relative slowdown
+    - memory_threshold (float): Allowed relative growth of peak memory
+    - min_seconds (float): Slowdowns smaller than this are timer noise, not regressions
+    - selection (tuple, optional): (names, sizes, channels) that were run; baseline cases
+      outside it are not expected in results. Every baseline case is expected if None
+
+    Returns:
+    - list of (result, baseline result, reasons) for every regression
+    - list of selected baseline results with no counterpart in results
+    """
+    reference = {(r['benchmark'], r['samples'], r['channels']): r for r in baseline['results']}
+    measured = {(r['benchmark'], r['samples'], r['channels']) for r in results}
+    missing = []
+    for key, ref in reference.items():
+        if selection is not None and not all(k in sel for k, sel in zip(key, selection)):
+            continue
+        if key not in measured:
+            missing.append(ref)
+    regressions = []
+    for result in results:
+        ref = reference.get((result['benchmark'], result['samples'], result['channels']))
+        if ref is None:
+            continue
+        reasons = []
+        if result['seconds'] > max(ref['seconds'] * (1 + time_threshold), ref['seconds'] + min_seconds):
+            reasons.append(f"time {result['seconds'] / ref['seconds']:.2f}x")
+        # Ignore sub-megabyte noise in the memory comparison
+        if result['peak_mb'] > ref['peak_mb'] * (1 + memory_threshold) + 1.0:
+            reasons.append(f"memory {result['peak_mb'] / max(ref['peak_mb'], 1e-9):.2f}x")
+        if reasons:
+            regressions.append((result, ref, reasons))
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS),
+                        help='Benchmarks to run (all by default)')
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e4, 1e5, 1e6], help='Sample counts')
+    parser.add_argument('--channels', nargs='+', type=int, default=[1, 20, 200], help='Channel counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-loop-elements', type=float, default=1e5,
+                        help='Cap of samples x channels for per-sample Python loops')
+    parser.add_argument('--max-elements', type=float, default=5e7, help='Cap of samples x channels')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--save-baseline', help='Write the results as a baseline JSON file')
+    parser.add_argument('--baseline', help='Compare against this baseline JSON file')
+    parser.add_argument('--time-threshold', type=float, default=0.25, help='Allowed relative slowdown')
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help='Allowed relative peak memory growth')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='Ignore slowdowns smaller than this')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes]
+    results, skipped = run_suite(args.only, sizes, args.channels, args.repeat,
+                                 int(args.max_loop_elements), int(args.max_elements))
+    if skipped:
+        print(f"{len(skipped)} case(s) skipped, {len(results)} run")
+    report = {'environment': environment(), 'results': results, 'skipped': skipped}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != report['environment']:
+            print("Warning: baseline was recorded in a different environment:", baseline.get('environment'))
+        regressions, missing = compare(results, baseline, args.time_threshold, args.memory_threshold,
+                                       args.min_seconds, selection=(args.only, sizes, args.channels))
+        for result, ref, reasons in regressions:
+            print(f"REGRESSION {result['benchmark']} {result['samples']:,d} x {result['channels']}: "
+                  f"{', '.join(reasons)} ({ref['seconds']:.4f} s -> {result['seconds']:.4f} s, "
+                  f"{ref['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB)")
+        for ref in missing:
+            print(f"MISSING {ref['benchmark']} {ref['samples']:,d} x {ref['channels']}: selected and in the baseline "
+                  f"but not run (check the caps and skipped cases above)")
+        if regressions or missing:
+            return 1
+        print("No regressions against", args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Build a sharded, lagged training set from a directory of FAST runs.
+
+Every run file is processed independently in a process pool (load and align,
+low-pass filter, build lags) and written as one Parquet shard, so lags never
+cross file boundaries. A manifest records the finished shards; rerunning after
+an interruption only redoes files without a valid manifest entry.
+"""
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fast_loader import load_fast_run
+from generate_lagged_dataset import build_lag_matrix
+from LPF import LowPassFilter
+
+# Leading underscore: ignored by Parquet dataset readers of out_dir
+MANIFEST_NAME = '_manifest.json'
+
+
+def _source_signature(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _process_run(path, shard_path, feature_names, target_column, num_lags, corner_freq, dtype,
+                 batch_size):
+    df = load_fast_run(path)
+
+    # Low-pass filter the features, starting fresh for every file
+    if corner_freq is not None:
+        dt = float(np.median(np.diff(df['Time'].to_numpy())))
+        freqs = [corner_freq.get(name) if isinstance(corner_freq, dict) else corner_freq
+                 for name in feature_names]
+        cols = [name for name, f in zip(feature_names, freqs) if f is not None]
+        if cols:
+            df = df.copy()
+            df[cols] = LowPassFilter().lp_filter_array(
+                df[cols].to_numpy(dtype=float), dt, [f for f in freqs if f is not None])
+
+    lags = build_lag_matrix(df, feature_names, target_column, num_lags, dtype=dtype)
+    time = df['Time'].to_numpy()[lags.rows + (num_lags + 1 if num_lags else 0)]
+
+    # Write batch by batch to a hidden scratch file, then rename
+    schema = pa.schema([('Time', pa.float64())]
+                       + [(name, pa.from_numpy_dtype(np.dtype(dtype))) for name in lags.columns]
+                       + [(target_column, pa.from_numpy_dtype(lags.y.dtype))])
+    tmp = os.path.join(os.path.dirname(shard_path), '.' + os.path.basename(shard_path) + '.tmp')
+    with pq.ParquetWriter(tmp, schema) as writer:
+        start = 0
+        for X, y in lags.batches(batch_size):
+            columns = [time[start:start + len(X)]] + list(X.T) + [y]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            start += len(X)
+    os.replace(tmp, shard_path)
+    return len(lags)
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def build_training_shards(run_dir, out_dir, feature_names, target_column, num_lags, pattern='*.xlsx',
+                          corner_freq=None, dtype=np.float32, n_workers=None, batch_size=100000):
+    """
+    Process every run in run_dir into a Parquet shard in out_dir.
+
+    Parameters:
+    - run_dir (str): Directory of run files (see fast_loader.load_fast_run)
+    - out_dir (str): Output directory for shards and _manifest.json
+    - feature_names, target_column, num_lags: See generate_lagged_dataset
+    - pattern (str): Glob pattern of run files inside run_dir
+    - corner_freq (float or dict, optional): Low-pass corner frequency [rad/s] for all
+      features, or per feature name; no filtering if None
+    - dtype (dtype): Feature dtype in the shards
+    - n_workers (int, optional): Worker processes, os.cpu_count() by default
+    - batch_size (int): Rows materialized at a time while writing a shard
+
+    Returns:
+    - manifest dict: parameters and, per run file, its shard, row count and source signature
+
+    Raises:
+    - RuntimeError listing the runs that failed, after every other run has finished and
+      been written to the manifest
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    params = {'feature_names': list(feature_names), 'target_column': target_column,
+              'num_lags': num_lags, 'corner_freq': corner_freq, 'dtype': np.dtype(dtype).name}
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = {'params': params, 'runs': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+        if previous.get('params') == params:
+            manifest['runs'] = previous['runs']
+
+    # Only runs without a finished, up-to-date shard are (re)processed
+    todo = {}
+    for path in sorted(glob.glob(os.path.join(run_dir, pattern))):
+        name = os.path.basename(path)
+        shard = os.path.splitext(name)[0] + '.parquet'
+        entry = manifest['runs'].get(name)
+        if (entry is None or entry['source'] != _source_signature(path)
+                or not os.path.exists(os.path.join(out_dir, entry['shard']))):
+            todo[name] = (path, shard)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = {pool.submit(_process_run, path, os.path.join(out_dir, shard), feature_names,
+                               target_column, num_lags, corner_freq, dtype, batch_size): name
+                   for name, (path, shard) in todo.items()}
+        # Record every shard as it finishes, so one failing file does not cost the others
+        failures = {}
+        for future in as_completed(futures):
+            name = futures[future]
+            path, shard = todo[name]
+            try:
+                rows = future.result()
+            except Exception as exc:
+                failures[name] = exc
+                continue
+            manifest['runs'][name] = {'shard': shard, 'rows': rows, 'source': _source_signature(path)}
+            _write_manifest(out_dir, manifest)
+
+    _write_manifest(out_dir, manifest)
+    if failures:
+        details = '\n'.join(f"- {name}: {type(exc).__name__}: {exc}" for name, exc in sorted(failures.items()))
+        raise RuntimeError(f"{len(failures)} of {len(todo)} run(s) failed, the other shards are in the "
+                           f"manifest and a rerun only redoes these:\n{details}") from next(iter(failures.values()))
+    return manifest
@@ -0,0 +1,176 @@
+"""
+Headless diagnostics report: histogram, lag scatter, ACF and PACF per channel.
+
+Batch counterpart of ACF_PACF_HISTOGRAM.py. The ACF/PACF of all channels come
+from one acf_engine call; each channel is then rendered to a 2x2 PNG panel by a
+pool of worker processes, and an index.html ties the
+panels together. Lag scatters with more than max_scatter_points points are
+drawn as hexbin densities, so the cost of a panel does not grow with the length
+of the series.
+
+Usage:
+    python diagnostics_report.py generated_data/new_entries_combined.xlsx --out report
+"""
+import argparse
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from acf_engine import acf_pacf
+
+
+def read_table(path):
+    """Read an .xlsx, .parquet or .csv file into a DataFrame."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.csv':
+        return pd.read_csv(path)
+    return pd.read_excel(path)
+
+
+def _file_name(index, name):
+    return f"{index:03d}_{re.sub(r'[^A-Za-z0-9_.-]+', '_', str(name))}.png"
+
+
+def _stem(ax, values, confint, title, ylabel):
+    lags = np.arange(len(values))
+    ax.stem(lags, values, basefmt=' ')
+    if confint is not None:
+        ax.fill_between(lags, confint[:, 0] - values, confint[:, 1] - values, alpha=0.25, linewidth=0)
+    ax.set_title(title)
+    ax.set_xlabel('Lag')
+    ax.set_ylabel(ylabel)
+    ax.grid()
+
+
+def render_channel(task):
+    """
+    Render the 2x2 diagnostics panel of one channel to a PNG.
+
+    Parameters:
+    - task (tuple): (index, name, series, acf, acf_confint, pacf, pacf_confint, options)
+
+    Returns:
+    - file name of the panel, relative to options['out_dir']
+    """
+    index, name, series, acf, acf_confint, pacf, pacf_confint, options = task
+    series = series[np.isfinite(series)]
+    # A bare Figure renders through Agg without pyplot, leaving the caller's backend alone
+    fig = Figure(figsize=(12, 8))
+    axes = fig.subplots(2, 2)
+
+    ax = axes[0, 0]
+    counts, edges = np.histogram(series, bins=options['bins'])
+    ax.stairs(counts, edges, fill=True, alpha=0.7, edgecolor='black')
+    ax.set_title(f"Histogram of {name}")
+    ax.set_xlabel('Value')
+    ax.set_ylabel('Frequency')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    ax = axes[0, 1]
+    yt, yt_1 = series[1:], series[:-1]
+    if len(yt) > options['max_scatter_points']:
+        # Density instead of millions of overlapping markers
+        hb = ax.hexbin(yt_1, yt, gridsize=options['gridsize'], bins='log', mincnt=1)
+        fig.colorbar(hb, ax=ax, label='count')
+    else:
+        ax.scatter(yt_1, yt, s=8, alpha=0.7, edgecolors='black', linewidths=0.3)
+    ax.set_title(f"y_t vs y_t-1 for {name}")
+    ax.set_xlabel('y_t-1 (Lagged Value)')
+    ax.set_ylabel('y_t (Current Value)')
+    ax.grid()
+
+    _stem(axes[1, 0], acf, acf_confint, f"ACF - {name}", 'Autocorrelation')
+    _stem(axes[1, 1], pacf, pacf_confint, f"PACF - {name}", 'Partial Autocorrelation')
+
+    fig.tight_layout()
+    file_name = _file_name(index, name)
+    fig.savefig(os.path.join(options['out_dir'], file_name), dpi=options['dpi'])
+    return file_name
+
+
+def write_html_report(out_dir, names, files, title='Channel diagnostics'):
+    """Write index.html listing every channel panel; returns its path."""
+    rows = '\n'.join(
+        f'<h2 id="{html.escape(f)}">{html.escape(str(n))}</h2>\n<img src="{html.escape(f)}" alt="{html.escape(str(n))}">'
+        for n, f in zip(names, files))
+    links = ' | '.join(f'<a href="#{html.escape(f)}">{html.escape(str(n))}</a>' for n, f in zip(names, files))
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                 f'<style>img{{max-width:100%}}</style></head><body>\n<h1>{html.escape(title)}</h1>\n'
+                 f'<p>{links}</p>\n{rows}\n</body></html>\n')
+    return path
+
+
+def build_report(df, out_dir, nlags=50, alpha=0.05, bins=20, max_scatter_points=50000,
+                 gridsize=80, dpi=80, n_workers=None, title='Channel diagnostics'):
+    """
+    Render diagnostics for every numeric column of df and write an HTML report.
+
+    Parameters:
+    - df (DataFrame): One channel per column
+    - out_dir (str): Directory for the PNG panels and index.html
+    - nlags (int): Largest ACF/PACF lag
+    - alpha (float, optional): Confidence level of the ACF/PACF bands, None to omit them
+    - bins (int): Histogram bins
+    - max_scatter_points (int): Lag scatters larger than this are drawn as hexbin densities
+    - gridsize (int): Hexbin grid size
+    - dpi (int): Resolution of the panels
+    - n_workers (int, optional): Rendering processes, os.cpu_count() by default
+    - title (str): Report title
+
+    Returns:
+    - path of index.html
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    df = df.select_dtypes(include='number')
+    data = df.to_numpy(dtype=float)
+    stats = acf_pacf(data, nlags=nlags, alpha=alpha)
+    acf_confint = stats.get('acf_confint')
+    pacf_confint = stats.get('pacf_confint')
+
+    options = {'out_dir': out_dir, 'bins': bins, 'max_scatter_points': max_scatter_points,
+               'gridsize': gridsize, 'dpi': dpi}
+    tasks = [(i, name, data[:, i], stats['acf'][:, i], None if acf_confint is None else acf_confint[:, i],
+              stats['pacf'][:, i], None if pacf_confint is None else pacf_confint[:, i], options)
+             for i, name in enumerate(df.columns)]
+
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            files = list(pool.map(render_channel, tasks))
+    else:
+        files = [render_channel(task) for task in tasks]
+    return write_html_report(out_dir, list(df.columns), files, title)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('path', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated_data',
+                                             'new_entries_combined.xlsx'),
+                        help='Input .xlsx, .parquet or .csv file')
+    parser.add_argument('--out', default='diagnostics_report', help='Output directory')
+    parser.add_argument('--nlags', type=int, default=50)
+    parser.add_argument('--bins', type=int, default=20)
+    parser.add_argument('--max-scatter-points', type=int, default=50000)
+    parser.add_argument('--dpi', type=int, default=80)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df = read_table(args.path)
+    report = build_report(df, args.out, nlags=args.nlags, bins=args.bins,
+                          max_scatter_points=args.max_scatter_points, dpi=args.dpi,
+                          n_workers=args.workers, title=os.path.basename(args.path))
+    print(f"Report written to {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Native, vectorized turbine simulation and baseline controller.
+
+N turbines advance in lockstep as arrays in a single time loop, using the same
+1DOF rotor model as sim_ws_wd_series. The baseline controller runs in NumPy:
+- generator torque: K * omega^2 with K from the Cq table, saturated at rated torque
+- blade pitch: gain-scheduled PI on filtered generator speed
+- yaw: yaw error filtered with the LowPassFilter difference equation, fixed-rate
+  yawing with start/stop thresholds
+
+BaselineControllerInterface wraps the controller behind ControllerInterface's
+call_controller / kill_discon, so sim_ws_wd_series itself can run without a
+compiled controller (e.g. on CI machines).
+"""
+import numpy as np
+
+from LPF import LowPassFilterBank
+from rotor_performance import RotorSurface
+
+# Unit conversions, as in rosco.toolbox.sim
+deg2rad = np.deg2rad(1)
+rad2deg = np.rad2deg(1)
+rpm2RadSec = 2.0*(np.pi)/60.0
+
+# Arrays returned by FarmSimulation.run, same names as sim_ws_wd_series stores
+OUTPUTS = ('bld_pitch', 'rot_speed', 'gen_speed', 'aero_torque', 'gen_torque',
+           'gen_power', 'nac_yaw', 'nac_yawrate', 'nac_yawerr')
+
+
+def cq_surface(turbine):
+    """RotorSurface of turbine.Cq, converting a ROSCO RotorPerformance if needed."""
+    if isinstance(turbine.Cq, RotorSurface):
+        return turbine.Cq
+    return RotorSurface.from_rosco(turbine.Cq)
+
+
+def optimal_torque_gain(turbine, surface=None):
+    """
+    Region 2 generator torque gain K [Nm/(rad/s)^2] from the Cq table.
+
+    At the maximum-Cp (= Cq * TSR) grid point, aero torque is
+    0.5 rho pi R^5 Cq / TSR^2 * omega_rot^2; referred to the generator side.
+    """
+    surface = cq_surface(turbine) if surface is None else surface
+    cp = surface.table * surface.tsr[:, None]
+    j, _ = np.unravel_index(np.argmax(cp), cp.shape)
+    cq_opt = surface.table.flat[np.argmax(cp)]
+    R = turbine.rotor_radius
+    return 0.5 * turbine.rho * np.pi * R**5 * cq_opt / surface.tsr[j]**2 / turbine.Ng**3
+
+
+class BaselineController:
+    """
+    Vectorized baseline torque, pitch and yaw controller for N turbines.
+
+    Defaults are those of the NREL 5MW baseline controller (Jonkman et al., 2009),
+    with rad and rad/s units as in ROSCO.
+    """
+    def __init__(self, turbine, n_turbines, dt,
+                 rated_power=5.0e6,
+                 rated_gen_speed=1173.7 * rpm2RadSec,
+                 torque_gain=None,
+                 pitch_kp=0.01882681,
+                 pitch_ki=0.008068634,
+                 pitch_gs_angle=0.1099965,
+                 min_pitch=0.0,
+                 max_pitch=90.0 * deg2rad,
+                 max_pitch_rate=8.0 * deg2rad,
+                 speed_filter_corner=0.25 * 2 * np.pi,
+                 yaw_filter_corner=0.17952,
+                 yaw_rate=0.3 * deg2rad,
+                 yaw_start_error=8.0 * deg2rad,
+                 yaw_stop_error=0.5 * deg2rad):
+        """
+        Parameters:
+        - turbine: Object with rotor_radius, Ng, GenEff (%), rho and Cq
+        - n_turbines (int): Number of turbines
+        - dt (float): Time step [s]
+        - rated_power (float): Rated electrical power [W]
+        - rated_gen_speed (float): Rated generator speed [rad/s]
+        - torque_gain (float, optional): Region 2 gain K [Nm/(rad/s)^2], from the Cq table by default
+        - pitch_kp, pitch_ki (float): PI gains at zero pitch [s], [-]
+        - pitch_gs_angle (float): Pitch at which the PI gains are halved [rad]
+        - min_pitch, max_pitch (float): Pitch limits [rad]
+        - max_pitch_rate (float): Pitch rate limit [rad/s]
+        - speed_filter_corner (float): Generator speed filter corner frequency [rad/s]
+        - yaw_filter_corner (float): Yaw error filter corner frequency [rad/s]
+        - yaw_rate (float): Nacelle yaw rate while yawing [rad/s]
+        - yaw_start_error, yaw_stop_error (float): Filtered yaw error to start / stop yawing [rad]
+        """
+        self.dt = dt
+        self.rated_gen_speed = rated_gen_speed
+        self.rated_torque = rated_power / (turbine.GenEff / 100 * rated_gen_speed)
+        self.torque_gain = optimal_torque_gain(turbine) if torque_gain is None else torque_gain
+        self.pitch_kp = pitch_kp
+        self.pitch_ki = pitch_ki
+        self.pitch_gs_angle = pitch_gs_angle
+        self.min_pitch = min_pitch
+        self.max_pitch = max_pitch
+        self.max_pitch_rate = max_pitch_rate
+        self.yaw_rate = yaw_rate
+        self.yaw_start_error = yaw_start_error
+        self.yaw_stop_error = yaw_stop_error
+
+        self.speed_filter = LowPassFilterBank(n_turbines, dt, speed_filter_corner)
+        self.yaw_filter = LowPassFilterBank(n_turbines, dt, yaw_filter_corner)
+        self.pitch = np.full(n_turbines, float(min_pitch))
+        self.integrator = np.zeros(n_turbines)
+        self.yawing = np.zeros(n_turbines, dtype=bool)
+
+    def reset(self, pitch):
+        """Start from the given pitch [rad] with integrator state to match."""
+        self.pitch[...] = pitch
+        gain = self.pitch_ki / (1 + self.pitch / self.pitch_gs_angle)
+        self.integrator[...] = np.clip(self.pitch, self.min_pitch, self.max_pitch) / gain
+        self.speed_filter.reset()
+        self.yaw_filter.reset()
+        self.yawing[...] = False
+
+    def step(self, gen_speed, yaw_error):
+        """
+        Advance all turbines by one time step.
+
+        Parameters:
+        - gen_speed (array): Generator speed [rad/s]
+        - yaw_error (array): Measured wind direction minus nacelle yaw [rad]
+
+        Returns:
+        - gen_torque [Nm], bld_pitch [rad], nac_yawrate [rad/s] arrays
+        """
+        speed = self.speed_filter.step(gen_speed)
+
+        # Torque: optimal-TSR tracking below rated, rated torque above
+        gen_torque = np.minimum(self.torque_gain * speed**2, self.rated_torque)
+
+        # Pitch: gain-scheduled PI with anti-windup and rate limit
+        error = speed - self.rated_gen_speed
+        schedule = 1 / (1 + self.pitch / self.pitch_gs_angle)
+        ki = self.pitch_ki * schedule
+        self.integrator += error * self.dt
+        self.integrator = np.clip(self.integrator, self.min_pitch / ki, self.max_pitch / ki)
+        command = np.clip(self.pitch_kp * schedule * error + ki * self.integrator,
+                          self.min_pitch, self.max_pitch)
+        max_step = self.max_pitch_rate * self.dt
+        self.pitch = np.clip(command, self.pitch - max_step, self.pitch + max_step)
+        gen_torque = np.where(self.pitch > self.min_pitch, self.rated_torque, gen_torque)
+
+        # Yaw: start above yaw_start_error, keep yawing until below yaw_stop_error
+        filtered = self.yaw_filter.step(yaw_error)
+        magnitude = np.abs(filtered)
+        self.yawing = np.where(self.yawing, magnitude > self.yaw_stop_error, magnitude > self.yaw_start_error)
+        nac_yawrate = np.where(self.yawing, np.sign(filtered) * self.yaw_rate, 0.0)
+
+        return gen_torque, self.pitch.copy(), nac_yawrate
+
+
+class BaselineControllerInterface:
+    """Single-turbine BaselineController with the call_controller / kill_discon interface."""
+    def __init__(self, turbine, dt, init_pitch=0.0, **kwargs):
+        self.controller = BaselineController(turbine, 1, dt, **kwargs)
+        self.controller.reset(init_pitch)
+
+    def call_controller(self, turbine_state):
+        gen_torque, bld_pitch, nac_yawrate = self.controller.step(
+            np.array([turbine_state['gen_speed']]), np.array([turbine_state['Y_MeasErr']]))
+        return gen_torque[0], bld_pitch[0], nac_yawrate[0]
+
+    def kill_discon(self):
+        pass
+
+
+class FarmSimulation:
+    """
+    Lockstep 1DOF simulation of N turbines with the native baseline controller.
+
+    The full turbine and controller state lives on this object, so a run can
+    be split into blocks (see run) and the object pickled in between.
+    """
+    def __init__(self, turbine, n_turbines, dt, wd_init,
+                 rotor_rpm_init=10, init_pitch=0.0, init_yaw=None, controller=None):
+        """
+        Parameters:
+        - turbine: Object with rotor_radius, Ng, J, GenEff (%), rho and Cq
+        - n_turbines (int): Number of turbines
+        - dt (float): Time step [s]
+        - wd_init (float or array): Wind direction at the initial time [deg]
+        - rotor_rpm_init (float or array): Initial rotor speed [rpm]
+        - init_pitch (float or array): Initial blade pitch [rad]
+        - init_yaw (float or array, optional): Initial yaw [deg], aligned with wd_init if None
+        - controller (BaselineController, optional): Controller, default parameters if None
+        """
+        shape = (n_turbines,)
+        self.dt = dt
+        self.R = turbine.rotor_radius
+        self.J = turbine.J
+        self.GenEff = turbine.GenEff
+        self.Ng = turbine.Ng
+        self.rho = turbine.rho
+        self.surface = cq_surface(turbine)
+        if controller is None:
+            controller = BaselineController(turbine, n_turbines, dt)
+            controller.reset(init_pitch)
+        self.controller = controller
+
+        wd_init = np.broadcast_to(np.asarray(wd_init, dtype=float), shape)
+        init_yaw = wd_init if init_yaw is None else init_yaw
+        self.state = {
+            'bld_pitch': np.broadcast_to(np.asarray(init_pitch, dtype=float), shape).copy(),
+            'rot_speed': np.broadcast_to(np.asarray(rotor_rpm_init, dtype=float) * rpm2RadSec, shape).copy(),
+            'aero_torque': np.full(shape, 1000.0),
+            'gen_power': np.zeros(shape),
+            'nac_yaw': np.broadcast_to(np.asarray(init_yaw, dtype=float), shape).copy(),
+            'nac_yawrate': np.zeros(shape),
+        }
+        self.state['gen_speed'] = self.state['rot_speed'] * self.Ng
+        # Same starting torque as sim_ws_wd_series
+        self.state['gen_torque'] = np.ones(shape)
+        self.state['nac_yawerr'] = (wd_init - self.state['nac_yaw']) * deg2rad
+
+    def run(self, ws_array, wd_array):
+        """
+        Advance the farm over a block of time steps.
+
+        Parameters:
+        - ws_array (array): Wind speed [m/s], shape (n_steps, n_turbines)
+        - wd_array (array): Wind direction [deg], shape (n_steps, n_turbines)
+
+        Returns:
+        - dict of output arrays (see OUTPUTS), shape (n_steps, n_turbines)
+        """
+        ws_array = np.asarray(ws_array, dtype=float)
+        wd_array = np.asarray(wd_array, dtype=float)
+        n_steps = len(ws_array)
+        out = {name: np.empty(ws_array.shape) for name in OUTPUTS}
+
+        # Loop invariants
+        dt, R, Ng = self.dt, self.R, self.Ng
+        aero_gain = 0.5 * self.rho * (np.pi * R**2) * R
+        speed_gain = dt / self.J
+        eff = self.GenEff / 100
+        interp = self.surface.interp
+        control = self.controller.step
+        s = self.state
+        pitch, rot_speed, gen_torque = s['bld_pitch'], s['rot_speed'], s['gen_torque']
+        nac_yaw, nac_yawerr = s['nac_yaw'], s['nac_yawerr']
+
+        for i in range(n_steps):
+            ws = ws_array[i]
+            yawerr_meas = nac_yawerr
+            nac_yawerr = (wd_array[i] - nac_yaw) * deg2rad
+
+            # 1DOF rotor model, all turbines at once
+            cq = interp(pitch, rot_speed * R / ws)
+            aero_torque = aero_gain * cq * ws**2 * np.cos(nac_yawerr)**2
+            rot_speed = rot_speed + speed_gain * (aero_torque * eff - Ng * gen_torque)
+            gen_speed = rot_speed * Ng
+
+            gen_torque, pitch, nac_yawrate = control(gen_speed, yawerr_meas)
+            nac_yaw = nac_yaw + nac_yawrate * rad2deg * dt
+
+            out['bld_pitch'][i] = pitch
+            out['rot_speed'][i] = rot_speed
+            out['gen_speed'][i] = gen_speed
+            out['aero_torque'][i] = aero_torque
+            out['gen_torque'][i] = gen_torque
+            out['gen_power'][i] = gen_speed * gen_torque * eff
+            out['nac_yaw'][i] = nac_yaw
+            out['nac_yawrate'][i] = nac_yawrate
+            out['nac_yawerr'][i] = nac_yawerr
+
+        if n_steps:
+            for name in OUTPUTS:
+                s[name] = out[name][-1].copy()
+        return out
+
+
+def simulate_farm(turbine, t_array, ws_array, wd_array, rotor_rpm_init=10, init_pitch=0.0,
+                  init_yaw=None, controller=None):
+    """
+    Simulate N turbines in lockstep with the native baseline controller.
+
+    Parameters:
+    - turbine: Object with rotor_radius, Ng, J, GenEff (%), rho and Cq
+    - t_array (array): Time steps [s]
+    - ws_array (array): Wind speeds [m/s], shape (n_steps,) or (n_steps, n_turbines)
+    - wd_array (array): Wind directions [deg], same shape as ws_array
+    - rotor_rpm_init, init_pitch, init_yaw: Initial conditions, scalar or per turbine
+    - controller (BaselineController, optional): Controller, default parameters if None
+
+    Returns:
+    - dict of output arrays (see OUTPUTS), shape (n_steps, n_turbines); the
+      first row holds the initial conditions, as in sim_ws_wd_series
+    """
+    ws_array = np.asarray(ws_array, dtype=float)
+    wd_array = np.asarray(wd_array, dtype=float)
+    if ws_array.ndim == 1:
+        ws_array, wd_array = ws_array[:, None], wd_array[:, None]
+    dt = t_array[1] - t_array[0]
+
+    sim = FarmSimulation(turbine, ws_array.shape[1], dt, wd_array[0], rotor_rpm_init,
+                         init_pitch, init_yaw, controller)
+    initial = {name: value.copy() for name, value in sim.state.items()}
+    out = sim.run(ws_array[1:], wd_array[1:])
+    return {name: np.vstack([initial[name][None, :], out[name]]) for name in OUTPUTS}
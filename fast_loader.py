@@ -0,0 +1,480 @@
+"""
+Loading of FAST simulation runs (FAST_Output + Debug_Output workbooks).
+
+Importable version of the steps in "Load Data Efficiently (Parquet or Excel).py",
+plus a Parquet ingestion cache keyed on the workbook content and the loader
+parameters, so a changed or different workbook is never served from a stale entry.
+excel_to_parquet copies a single worksheet to Parquet row batch by row batch, for
+workbooks too large to load whole.
+"""
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from rotor_performance import file_digest
+
+SHEETS = ['FAST_Output', 'Debug_Output']
+
+# Bump when the cached processing changes, to invalidate old entries
+CACHE_VERSION = 2
+
+# Content hashes already computed in this process, keyed on (path, size, mtime)
+_digests = {}
+
+
+def interp_columns(target_time, source_time, values, out_of_range='nan', block_columns=64, max_gap=None):
+    """
+    Linearly interpolate every column of values onto target_time in one pass.
+
+    The bracketing indices and weights are computed once and applied to blocks
+    of columns; columns with NaN gaps are interpolated on their valid samples.
+
+    Parameters:
+    - target_time (array): Target timestamps, (n_target,)
+    - source_time (array): Sorted source timestamps, (n_source,)
+    - values (array): Source values, (n_source, n_columns)
+    - out_of_range (str): 'nan' or 'clamp' (hold the first / last source value)
+    - block_columns (int): Columns interpolated per block, bounds temporary memory
+    - max_gap (float, optional): In a column with NaN gaps, targets with no valid sample
+      within max_gap before or after them are NaN instead of bridged or held
+
+    Returns:
+    - interpolated values (n_target, n_columns), boolean mask of out-of-range targets
+    """
+    target_time = np.asarray(target_time, dtype=float)
+    source_time = np.asarray(source_time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    n_target, n_columns = len(target_time), values.shape[1]
+    if len(source_time) == 0:
+        return np.full((n_target, n_columns), np.nan), np.ones(n_target, dtype=bool)
+
+    outside = (target_time < source_time[0]) | (target_time > source_time[-1])
+    t = np.clip(target_time, source_time[0], source_time[-1])
+    if len(source_time) == 1:
+        lo = hi = np.zeros(n_target, dtype=np.intp)
+        w = np.zeros(n_target)
+    else:
+        hi = np.clip(np.searchsorted(source_time, t, side='right'), 1, len(source_time) - 1)
+        lo = hi - 1
+        span = source_time[hi] - source_time[lo]
+        w = np.divide(t - source_time[lo], span, out=np.zeros(n_target), where=span > 0)
+
+    # Channel-major working layout: every gather reads one contiguous row per channel
+    out = np.empty((n_columns, n_target))
+    has_nan = np.isnan(values).any(axis=0)
+    dense = np.flatnonzero(~has_nan)
+    channels = values.T
+    for start in range(0, len(dense), block_columns):
+        cols = dense[start:start + block_columns]
+        v = np.ascontiguousarray(channels[cols])
+        block = v.take(lo, axis=1)
+        step = v.take(hi, axis=1)
+        step -= block
+        step *= w
+        block += step
+        out[cols] = block
+    for col in np.flatnonzero(has_nan):
+        valid = ~np.isnan(values[:, col])
+        if valid.any():
+            valid_time = source_time[valid]
+            out[col] = np.interp(t, valid_time, values[valid, col])
+            if max_gap is not None:
+                after = np.searchsorted(valid_time, t, side='left')
+                before = np.searchsorted(valid_time, t, side='right') - 1
+                far = ((after == len(valid_time)) | (before < 0)
+                       | (valid_time[np.minimum(after, len(valid_time) - 1)] - t > max_gap)
+                       | (t - valid_time[np.maximum(before, 0)] > max_gap))
+                out[col, far] = np.nan
+        else:
+            out[col] = np.nan
+
+    out = out.T
+    if out_of_range == 'nan':
+        out[outside] = np.nan
+    return out, outside
+
+
+def _numeric_sorted(df, time_column):
+    if not pd.api.types.is_float_dtype(df[time_column]):
+        df = df.assign(**{time_column: pd.to_numeric(df[time_column], errors='coerce')})
+    if df[time_column].isna().any():
+        df = df.dropna(subset=[time_column])
+    if not df[time_column].is_monotonic_increasing:
+        df = df.sort_values(time_column, kind='stable')
+    return df
+
+
+def _split_columns(df, time_column):
+    """Numeric channels (interpolated) and other channels (nearest sample), in column order."""
+    cols = [c for c in df.columns if c != time_column]
+    numeric = [c for c in cols if pd.api.types.is_numeric_dtype(df[c])]
+    return cols, numeric, [c for c in cols if c not in numeric]
+
+
+def _nearest_rows(target_time, source_time, values, out_of_range):
+    """Values of the nearest source sample (the earlier one on ties), as merge_asof(direction='nearest')."""
+    n_target = len(target_time)
+    if len(source_time) == 0:
+        return np.full((n_target, values.shape[1]), None, dtype=object)
+    after = np.minimum(np.searchsorted(source_time, target_time, side='left'), len(source_time) - 1)
+    before = np.maximum(after - 1, 0)
+    pick = np.where(target_time - source_time[before] <= source_time[after] - target_time, before, after)
+    out = values[pick]
+    if out_of_range == 'nan':
+        out[(target_time < source_time[0]) | (target_time > source_time[-1])] = None
+    return out
+
+
+def _aligned_frame(t, source_time, numeric, other, cols, numeric_cols, other_cols, out_of_range,
+                   block_columns, max_gap):
+    values, outside = interp_columns(t, source_time, numeric, out_of_range, block_columns, max_gap)
+    frame = dict(zip(numeric_cols, values.T))
+    if other_cols:
+        frame.update(zip(other_cols, _nearest_rows(t, source_time, other, out_of_range).T))
+    return pd.DataFrame({c: frame[c] for c in cols}, index=pd.RangeIndex(len(t))), outside
+
+
+def _source_names(sources):
+    if isinstance(sources, dict):
+        return list(sources.keys()), list(sources.values())
+    return [str(i) for i in range(len(sources))], list(sources)
+
+
+def _join_columns(target, names, frames):
+    """Concatenate the aligned source frames onto target, suffixing clashing names."""
+    taken = set(target.columns)
+    parts = [target.reset_index(drop=True)]
+    for name, frame in zip(names, frames):
+        labels = [c if c not in taken else f"{c}_{name}" for c in frame.columns]
+        taken.update(labels)
+        parts.append(frame.set_axis(labels, axis=1))
+    return pd.concat(parts, axis=1)
+
+
+def align_sources(target, sources, time_column='Time', out_of_range='nan', block_columns=64, max_gap=None):
+    """
+    Interpolate N secondary sources onto the time grid of target.
+
+    Numeric channels are interpolated linearly; other channels (e.g. text status
+    columns) take the value of the nearest source sample.
+
+    Parameters:
+    - target (DataFrame): Frame whose time_column is the target grid (e.g. FAST_Output)
+    - sources (list or dict of DataFrame): Secondary frames (e.g. Debug_Output); with a
+      dict, the keys suffix column names that clash
+    - time_column (str): Time column in all frames
+    - out_of_range (str): 'nan' or 'clamp', see interp_columns
+    - block_columns, max_gap: See interp_columns
+
+    Returns:
+    - aligned DataFrame (target columns, then every source's channels),
+      report dict per source: n_below, n_above and the out-of-range target timestamps
+    """
+    target = _numeric_sorted(target, time_column)
+    t = target[time_column].to_numpy(dtype=float)
+    names, frames = _source_names(sources)
+
+    blocks, report = [], {}
+    for name, src in zip(names, frames):
+        src = _numeric_sorted(src, time_column)
+        cols, numeric_cols, other_cols = _split_columns(src, time_column)
+        aligned, outside = _aligned_frame(t, src[time_column].to_numpy(dtype=float),
+                                          src[numeric_cols].to_numpy(dtype=float),
+                                          src[other_cols].to_numpy(dtype=object), cols, numeric_cols,
+                                          other_cols, out_of_range, block_columns, max_gap)
+        blocks.append(aligned)
+        first = src[time_column].iloc[0] if len(src) else np.inf
+        report[name] = {'n_below': int((outside & (t < first)).sum()),
+                        'n_above': int((outside & (t >= first)).sum()),
+                        'out_of_range': t[outside]}
+    return _join_columns(target, names, blocks), report
+
+
+class _SourceStream:
+    """Bounded buffer over one source's chunks, kept just wide enough to bracket the targets."""
+    def __init__(self, chunks, time_column, max_gap):
+        self.chunks = iter(chunks)
+        self.time_column = time_column
+        self.max_gap = max_gap
+        self.time = np.empty(0)
+        self.values = np.empty((0, 0))
+        self.other = np.empty((0, 0), dtype=object)
+        self.columns = []
+        self.numeric_columns = []
+        self.other_columns = []
+        self.first = None
+        self.done = False
+
+    def _needs_more(self, t_max):
+        if len(self.time) == 0 or self.time[-1] < t_max:
+            return True
+        # A column with a NaN gap needs a valid right bracket at or after t_max too,
+        # unless max_gap past t_max is covered without one (its targets are NaN then)
+        tail = self.values[np.searchsorted(self.time, t_max, side='left'):]
+        if (~np.isnan(tail)).any(axis=0).all():
+            return False
+        return self.max_gap is None or self.time[-1] < t_max + self.max_gap
+
+    def cover(self, t_max):
+        """
+        Read chunks until the buffer brackets t_max in every column, or the source ends.
+
+        A column in a NaN gap is read ahead at most max_gap past t_max; with
+        max_gap None, up to the end of the source for an all-NaN channel.
+        """
+        while not self.done and self._needs_more(t_max):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.done = True
+                break
+            chunk = _numeric_sorted(chunk, self.time_column)
+            if self.first is None and not self.columns:
+                self.columns, self.numeric_columns, self.other_columns = _split_columns(chunk, self.time_column)
+                self.values = np.empty((0, len(self.numeric_columns)))
+                self.other = np.empty((0, len(self.other_columns)), dtype=object)
+            if len(chunk) == 0:
+                continue
+            if self.first is None:
+                self.first = float(chunk[self.time_column].iloc[0])
+            self.time = np.concatenate([self.time, chunk[self.time_column].to_numpy(dtype=float)])
+            self.values = np.vstack([self.values, chunk[self.numeric_columns].to_numpy(dtype=float)])
+            self.other = np.vstack([self.other, chunk[self.other_columns].to_numpy(dtype=object)])
+
+    def trim(self, t_max):
+        """Drop rows no longer needed as left brackets for targets after t_max."""
+        k = int(np.searchsorted(self.time, t_max, side='right')) - 1
+        if k <= 0:
+            return
+        # Keep a valid left bracket for every column with NaN gaps, unless it is
+        # already more than max_gap behind every later target
+        valid = ~np.isnan(self.values[:k + 1])
+        has_valid = valid.any(axis=0)
+        if has_valid.any():
+            last_valid = k - np.argmax(valid[::-1], axis=0)
+            if self.max_gap is not None:
+                has_valid &= self.time[last_valid] >= t_max - self.max_gap
+            if has_valid.any():
+                k = min(k, int(last_valid[has_valid].min()))
+        self.time = self.time[k:]
+        self.values = self.values[k:]
+        self.other = self.other[k:]
+
+
+def align_stream(target_chunks, source_chunks, time_column='Time', out_of_range='nan', block_columns=64,
+                 max_gap=60.0):
+    """
+    Streaming align_sources for inputs larger than memory.
+
+    Parameters:
+    - target_chunks (iterable of DataFrame): Target frames in increasing time order
+    - source_chunks (list or dict of iterables of DataFrame): Chunks of every source, in
+      increasing time order
+    - time_column, out_of_range, block_columns: See align_sources
+    - max_gap (float, optional): See interp_columns; also how far past a target chunk a
+      source is read ahead while a column is in a NaN gap. None bridges gaps of any
+      length, at the cost of reading an all-NaN channel's source to its end
+
+    Yields:
+    - (aligned DataFrame, report dict) per target chunk; equal to align_sources(...,
+      max_gap=max_gap) on the concatenated inputs
+    """
+    names, iterables = _source_names(source_chunks)
+    streams = [_SourceStream(chunks, time_column, max_gap) for chunks in iterables]
+
+    for target in target_chunks:
+        target = _numeric_sorted(target, time_column)
+        t = target[time_column].to_numpy(dtype=float)
+        t_max = t[-1] if len(t) else -np.inf
+
+        blocks, report = [], {}
+        for name, stream in zip(names, streams):
+            stream.cover(t_max)
+            aligned, outside = _aligned_frame(t, stream.time, stream.values, stream.other, stream.columns,
+                                              stream.numeric_columns, stream.other_columns, out_of_range,
+                                              block_columns, max_gap)
+            # Beyond the buffer end is only out of range once the source is exhausted
+            first = stream.first if stream.first is not None else np.inf
+            blocks.append(aligned)
+            report[name] = {'n_below': int((outside & (t < first)).sum()),
+                            'n_above': int((outside & (t >= first)).sum()),
+                            'out_of_range': t[outside]}
+            stream.trim(t_max)
+        yield _join_columns(target, names, blocks), report
+
+
+def merge_fast_debug(df_fast, df_debug):
+    """Put Debug_Output onto the FAST_Output time grid by linear interpolation in time."""
+    # Targets outside the Debug_Output time span hold its first / last value
+    df, _ = align_sources(df_fast, [df_debug], out_of_range='clamp')
+    return df
+
+
+def load_fast_run(path):
+    """
+    Load one run as a single DataFrame on the FAST_Output time grid.
+
+    Parameters:
+    - path (str): Excel workbook with FAST_Output and Debug_Output sheets, or a
+      Parquet file holding an already merged run
+
+    Returns:
+    - DataFrame sorted by Time
+    """
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        return pd.read_parquet(path)
+    df_sheets = pd.read_excel(path, sheet_name=SHEETS, engine="openpyxl")
+    return merge_fast_debug(df_sheets['FAST_Output'], df_sheets['Debug_Output'])
+
+
+def _read_sheet(path, sheet, columns):
+    usecols = None if columns is None else (lambda name: name == 'Time' or name in columns)
+    return pd.read_excel(path, sheet_name=sheet, usecols=usecols, engine="openpyxl")
+
+
+def downcast_frame(df, exclude=('Time',)):
+    """Downcast numeric columns to the smallest float / integer dtype (Time is kept)."""
+    for name in df.columns:
+        if name in exclude:
+            continue
+        if pd.api.types.is_float_dtype(df[name]):
+            df[name] = pd.to_numeric(df[name], downcast='float')
+        elif pd.api.types.is_integer_dtype(df[name]):
+            df[name] = pd.to_numeric(df[name], downcast='integer')
+    return df
+
+
+def _cached_digest(path):
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _digests:
+        _digests[key] = file_digest(path)
+    return _digests[key]
+
+
+def evict_cache(cache_dir, max_bytes, keep=(), pattern='*.parquet'):
+    """Delete least recently used entries (files matching pattern) until the cache is at most max_bytes."""
+    entries = [(os.stat(p).st_mtime_ns, os.path.getsize(p), p)
+               for p in glob.glob(os.path.join(cache_dir, pattern))]
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= max_bytes:
+            break
+        if p in keep:
+            continue
+        os.remove(p)
+        total -= size
+
+
+def load_fast_run_cached(path, cache_dir='fast_cache', columns=None, downcast=True,
+                         max_cache_bytes=2 * 1024**3, n_workers=None, verbose=False):
+    """
+    Load a run workbook through the content-addressed Parquet cache.
+
+    Parameters:
+    - path (str): Excel workbook with FAST_Output and Debug_Output sheets
+    - cache_dir (str): Cache directory
+    - columns (list of str, optional): Columns to read (Time is always read); all if None
+    - downcast (bool): Downcast numeric columns (except Time) to the smallest dtype
+    - max_cache_bytes (int): Size budget of cache_dir, least recently used entries are evicted
+    - n_workers (int, optional): Processes reading sheets in parallel, one per sheet by default
+    - verbose (bool): Print whether the cache was used
+
+    Returns:
+    - DataFrame on the FAST_Output time grid
+    """
+    params = {'version': CACHE_VERSION, 'sheets': SHEETS, 'downcast': bool(downcast),
+              'columns': None if columns is None else sorted(columns)}
+    h = hashlib.sha256(_cached_digest(path).encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    entry = os.path.join(cache_dir, h.hexdigest() + '.parquet')
+
+    if os.path.exists(entry):
+        if verbose:
+            print("Loading data from Parquet cache...")
+        os.utime(entry)  # Mark as recently used
+        return pd.read_parquet(entry)
+
+    if verbose:
+        print("Reading data from Excel (this may take time)...")
+    n_workers = len(SHEETS) if n_workers is None else n_workers
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(SHEETS))) as pool:
+            frames = list(pool.map(_read_sheet, [path] * len(SHEETS), SHEETS, [columns] * len(SHEETS)))
+    else:
+        frames = [_read_sheet(path, sheet, columns) for sheet in SHEETS]
+
+    df = merge_fast_debug(*frames)
+    if downcast:
+        df = downcast_frame(df)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f'.{os.getpid()}.tmp')
+    df.to_parquet(tmp, engine="pyarrow", compression="snappy")
+    os.replace(tmp, entry)
+    evict_cache(cache_dir, max_cache_bytes, keep=(entry,))
+    if verbose:
+        print("Excel data cached in Parquet format for faster access next time.")
+    return df
+
+
+def excel_to_parquet(path, out_path, sheet_name=0, batch_rows=100000):
+    """
+    Copy one worksheet to a Parquet file without loading the workbook whole.
+
+    Rows are streamed with openpyxl in read-only mode and written batch_rows at a
+    time, one row group per batch with column statistics. A column is numeric
+    (float64, empty cells NaN) when its first batch holds only numbers, otherwise
+    it is stored as strings.
+
+    Parameters:
+    - path (str): Excel workbook, header in the first row
+    - out_path (str): Parquet file to write
+    - sheet_name (int or str): Worksheet index or name
+    - batch_rows (int): Rows held in memory at a time
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    tmp = out_path + '.tmp'
+    writer = None
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(tuple(row[:len(header)]) + (None,) * (len(header) - len(row)))
+            if len(batch) == batch_rows:
+                writer = _write_excel_batch(writer, tmp, header, batch, pa, pq)
+                batch = []
+        if batch or writer is None:
+            writer = _write_excel_batch(writer, tmp, header, batch, pa, pq)
+    finally:
+        if writer is not None:
+            writer.close()
+        workbook.close()
+    os.replace(tmp, out_path)
+
+
+def _write_excel_batch(writer, tmp, header, batch, pa, pq):
+    columns = list(zip(*batch)) if batch else [()] * len(header)
+    if writer is None:
+        numeric = [all(v is None or isinstance(v, (int, float)) for v in values) for values in columns]
+        schema = pa.schema([(name, pa.float64() if is_numeric else pa.string())
+                            for name, is_numeric in zip(header, numeric)])
+        writer = pq.ParquetWriter(tmp, schema, write_statistics=True)
+    arrays = []
+    for values, field in zip(columns, writer.schema):
+        if pa.types.is_floating(field.type):
+            arrays.append(pa.array([np.nan if v is None else float(v) for v in values], type=pa.float64()))
+        else:
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+    return writer
@@ -1,6 +1,92 @@
 import pandas as pd
 import numpy as np
 
+class LagMatrix:
+    """
+    Lagged feature matrix backed by a sliding-window view.
+
+    No lagged copies are made: windows is a read-only (n_windows, n_features, n_lags)
+    view on one contiguous array of the feature columns, where window k holds
+    samples k .. k + n_lags - 1. Rows are only materialized by to_numpy, batches
+    or to_frame. Column order matches generate_lagged_dataset (per feature,
+    lags from num_lags + 1 down to 1).
+    """
+    def __init__(self, windows, rows, y, columns):
+        self.windows = windows
+        self.rows = rows  # window index of every output row
+        self.y = y  # target Series, indexed like the output rows
+        self.columns = columns
+        self.index = y.index
+        self._contiguous = len(rows) == 0 or rows[-1] - rows[0] + 1 == len(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def shape(self):
+        return len(self.rows), len(self.columns)
+
+    def to_numpy(self, start=0, stop=None):
+        """Materialize output rows [start, stop) as a 2-D (rows, features * lags) array."""
+        if self._contiguous and len(self.rows):
+            stop = len(self.rows) if stop is None else min(stop, len(self.rows))
+            block = self.windows[self.rows[0] + start:self.rows[0] + max(stop, start)]
+        else:
+            block = self.windows[self.rows[start:stop]]
+        return block.reshape(len(block), -1)
+
+    def batches(self, batch_size):
+        """Yield (X, y) numpy batches of at most batch_size rows, e.g. for model training."""
+        y = self.y.to_numpy()
+        for start in range(0, len(self.rows), batch_size):
+            stop = start + batch_size
+            yield self.to_numpy(start, stop), y[start:stop]
+
+    def to_frame(self):
+        """Return (X, y) as DataFrame / Series, identical to generate_lagged_dataset."""
+        X = pd.DataFrame(self.to_numpy(), index=self.index, columns=self.columns)
+        return X, self.y
+
+
+def build_lag_matrix(df, feature_names, target_column, num_lags, dtype=None):
+    """
+    Build the lag matrix of generate_lagged_dataset without copying lagged columns.
+
+    Parameters:
+    - df (DataFrame): Source data
+    - feature_names (list of str): Features to create lags for
+    - target_column (str): Target variable
+    - num_lags (int): As in generate_lagged_dataset (lags num_lags + 1 .. 1 are built)
+    - dtype (dtype, optional): Feature dtype, e.g. np.float32; float64 by default
+
+    Returns:
+    - LagMatrix
+    """
+    dtype = np.float64 if dtype is None else dtype
+    values = np.ascontiguousarray(df[feature_names].to_numpy(dtype=dtype))
+    n_rows = len(values)
+
+    if num_lags == 0:
+        windows = values[:, :, None]
+        rows = np.arange(n_rows)
+        return LagMatrix(windows, rows, df[target_column].copy(), list(feature_names))
+
+    # Row r uses samples r - n_lags .. r - 1, i.e. window k = r - n_lags
+    n_lags = num_lags + 1
+    windows = np.lib.stride_tricks.sliding_window_view(values, n_lags, axis=0)
+
+    # Same rows as dropna() on the lagged frame: no NaN in the row itself nor in its lags
+    row_ok = ~df.isna().to_numpy().any(axis=1)
+    bad_sample = np.concatenate([[0], np.cumsum(np.isnan(values).any(axis=1))])
+    r = np.arange(n_lags, n_rows)
+    valid = row_ok[r] & (bad_sample[r] - bad_sample[r - n_lags] == 0)
+    rows = r[valid] - n_lags
+
+    y = df[target_column].iloc[r[valid]]
+    columns = [f"{feature}_Lag_{lag}" for feature in feature_names for lag in range(n_lags, 0, -1)]
+    return LagMatrix(windows, rows, y, columns)
+
+
 # Function to generate lag features for multiple columns
 def generate_lagged_dataset(df, feature_names, target_column, num_lags):
     if num_lags == 0:
@@ -9,53 +95,38 @@ def generate_lagged_dataset(df, feature_names, target_column, num_lags):
         y = df[target_column].copy()
         return X, y
 
-    df_lagged = df.copy()
-
-    # Generate lag features for each feature
-    lagged_features = []
-    for feature in feature_names:
-        for lag in range( num_lags + 1,0,-1):  # Start from 1 to num_lags
-            lag_col = f"{feature}_Lag_{lag}"
-            df_lagged[lag_col] = df_lagged[feature].shift(lag)
-            lagged_features.append(lag_col)
-
-    # Drop rows with NaN values caused by shifting
-    df_lagged.dropna(inplace=True)
-
-    # Define X (features) and y (target)
-    X = df_lagged[lagged_features]
-    y = df_lagged[target_column]
-
-    return X, y
-
-# Create sample data
-np.random.seed(42)  # For reproducibility
-num_rows = 20
-time_values = np.arange(0, num_rows * 10, 10)  # Time in seconds (incrementing by 10s)
-rot_speed_values = np.random.randint(100, 500, size=num_rows)
-temperature_values = np.random.uniform(20, 100, size=num_rows)
-pressure_values = np.random.uniform(900, 1100, size=num_rows)
-A = np.random.uniform(1000, 2100, size=num_rows)
-
-# Create a DataFrame
-df_X = pd.DataFrame({
-    "Time": time_values,
-    "RotSpeed": rot_speed_values,
-    "Temperature": temperature_values,
-    "Pressure": pressure_values,
-    'A': A,
-})
-
-# Example usage
-num_lags = 1  # Change this to test with or without lags
-feature_names = ["RotSpeed", "Temperature", "Pressure"]  # Features to create lags for
-target_column = "A"  # Target variable
-
-X, y = generate_lagged_dataset(df_X, feature_names, target_column, num_lags)
-
-# Display results
-print("Features (X):")
-print(X.head())  # Show first few rows of X
-
-print("\nTarget (y):")
-print(y.head())  # Show first few rows of y
+    # Lag features for each feature (lags num_lags + 1 .. 1), rows with NaN lags dropped
+    return build_lag_matrix(df, feature_names, target_column, num_lags).to_frame()
+
+if __name__ == "__main__":
+    # Create sample data
+    np.random.seed(42)  # For reproducibility
+    num_rows = 20
+    time_values = np.arange(0, num_rows * 10, 10)  # Time in seconds (incrementing by 10s)
+    rot_speed_values = np.random.randint(100, 500, size=num_rows)
+    temperature_values = np.random.uniform(20, 100, size=num_rows)
+    pressure_values = np.random.uniform(900, 1100, size=num_rows)
+    A = np.random.uniform(1000, 2100, size=num_rows)
+
+    # Create a DataFrame
+    df_X = pd.DataFrame({
+        "Time": time_values,
+        "RotSpeed": rot_speed_values,
+        "Temperature": temperature_values,
+        "Pressure": pressure_values,
+        'A': A,
+    })
+
+    # Example usage
+    num_lags = 1  # Change this to test with or without lags
+    feature_names = ["RotSpeed", "Temperature", "Pressure"]  # Features to create lags for
+    target_column = "A"  # Target variable
+
+    X, y = generate_lagged_dataset(df_X, feature_names, target_column, num_lags)
+
+    # Display results
+    print("Features (X):")
+    print(X.head())  # Show first few rows of X
+
+    print("\nTarget (y):")
+    print(y.head())  # Show first few rows of y
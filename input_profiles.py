@@ -0,0 +1,226 @@
+"""
+Input-profile generators for wind speed and direction time series.
+
+A profile is a description (breakpoints and values, or a transient shape) that
+is evaluated on any time vector on demand. On sorted time vectors a step
+profile is rendered with one searchsorted of its breakpoints into t and one
+np.repeat, O(N + K log N) instead of one boolean mask per step. shifted()
+returns the same profile with moved breakpoints, and chunks() renders a long
+horizon block by block so it never has to be held in memory.
+
+Gusts and direction changes follow IEC 61400-1 ed. 3 (EOG, EDC).
+"""
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# IEC 61400-1 reference wind speed per turbine class and reference turbulence per category
+IEC_VREF = {'I': 50.0, 'II': 42.5, 'III': 37.5}
+IEC_IREF = {'A+': 0.18, 'A': 0.16, 'B': 0.14, 'C': 0.12}
+
+
+def _is_sorted(t):
+    return t.ndim == 1 and bool(np.all(t[1:] >= t[:-1]))
+
+
+class Profile(ABC):
+    """Base class: evaluate(t) on an array of times, plus shifting, summing and chunked rendering."""
+    @abstractmethod
+    def evaluate(self, t):
+        """Profile values at the times t (array)."""
+
+    @abstractmethod
+    def shifted(self, shift):
+        """The same profile with every time moved by shift."""
+
+    def __call__(self, t):
+        return self.evaluate(t)
+
+    def __add__(self, other):
+        return SumProfile(self, other)
+
+    def render(self, t0, dt, n_steps):
+        """Evaluate on the uniform grid t0 + dt * arange(n_steps); returns (t, values)."""
+        t = t0 + dt * np.arange(n_steps)
+        return t, self.evaluate(t)
+
+    def chunks(self, t0, dt, n_steps, chunk_steps=100000):
+        """
+        Lazily render the uniform grid t0 + dt * arange(n_steps) in blocks.
+
+        Yields:
+        - (t, values) per block of at most chunk_steps samples; concatenated they equal render()
+        """
+        for start in range(0, n_steps, chunk_steps):
+            t = t0 + dt * np.arange(start, min(start + chunk_steps, n_steps))
+            yield t, self.evaluate(t)
+
+
+class StepProfile(Profile):
+    """
+    Piecewise-constant profile.
+
+    values[i] holds on [times[i], times[i+1]) and values[-1] from the last time it
+    applies; before times[0] the profile is base. As in create_step_waveform, the
+    times may have one more entry than the values (the final time then starts
+    the last value's hold).
+
+    Parameters:
+    - times (array): Sorted step times
+    - values (array): Step values
+    - base (float): Value before the first step time
+    """
+    def __init__(self, times, values, base=0.0):
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        self.base = base
+        # Value of every segment: before times[0], then one per step time
+        idx = np.minimum(np.arange(len(self.times)), len(self.values) - 1)
+        self._segments = np.concatenate([[base], self.values[idx]])
+
+    def evaluate(self, t):
+        t = np.asarray(t, dtype=float)
+        if _is_sorted(t):
+            counts = np.diff(np.searchsorted(t, self.times, side='left'), prepend=0, append=len(t))
+            return np.repeat(self._segments, counts)
+        return self._segments[np.searchsorted(self.times, t, side='right')]
+
+    def shifted(self, shift):
+        return StepProfile(self.times + shift, self.values, self.base)
+
+
+class RampProfile(Profile):
+    """
+    Piecewise-linear profile through (times, values), held constant outside.
+
+    Parameters:
+    - times (array): Sorted breakpoint times
+    - values (array): Values at the breakpoints
+    """
+    def __init__(self, times, values):
+        self.times = np.asarray(times, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    def evaluate(self, t):
+        return np.interp(np.asarray(t, dtype=float), self.times, self.values)
+
+    def shifted(self, shift):
+        return RampProfile(self.times + shift, self.values)
+
+
+def ramp(t_start, t_end, v_start, v_end):
+    """Linear ramp from v_start at t_start to v_end at t_end."""
+    return RampProfile([t_start, t_end], [v_start, v_end])
+
+
+class TransientProfile(Profile):
+    """
+    amplitude * shape(tau) for tau = (t - t_start) / period in [0, 1], zero before.
+
+    Parameters:
+    - t_start (float): Start of the transient
+    - period (float): Duration of the transient
+    - amplitude (float): Scale of the shape
+    - shape (callable): Vectorized shape on tau in [0, 1]
+    - hold (bool): Keep amplitude * shape(1) after the transient instead of returning to zero
+    """
+    def __init__(self, t_start, period, amplitude, shape, hold=False):
+        self.t_start = t_start
+        self.period = period
+        self.amplitude = amplitude
+        self.shape = shape
+        self.hold = hold
+
+    def evaluate(self, t):
+        t = np.asarray(t, dtype=float)
+        out = np.zeros(t.shape)
+        t_end = self.t_start + self.period
+        if _is_sorted(t):
+            i0 = np.searchsorted(t, self.t_start, side='left')
+            i1 = np.searchsorted(t, t_end, side='right')
+            inside, after = slice(i0, i1), slice(i1, None)
+        else:
+            inside = (t >= self.t_start) & (t <= t_end)
+            after = t > t_end
+        out[inside] = self.amplitude * self.shape((t[inside] - self.t_start) / self.period)
+        if self.hold:
+            out[after] = self.amplitude * self.shape(1.0)
+        return out
+
+    def shifted(self, shift):
+        return TransientProfile(self.t_start + shift, self.period, self.amplitude, self.shape, self.hold)
+
+
+class SumProfile(Profile):
+    """Sum of several profiles, e.g. a mean wind step plus a gust."""
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def evaluate(self, t):
+        t = np.asarray(t, dtype=float)
+        return sum(part.evaluate(t) for part in self.parts)
+
+    def shifted(self, shift):
+        return SumProfile(*(part.shifted(shift) for part in self.parts))
+
+
+def _eog_shape(tau):
+    return -0.37 * np.sin(3 * np.pi * tau) * (1 - np.cos(2 * np.pi * tau))
+
+
+def _edc_shape(tau):
+    return 0.5 * (1 - np.cos(np.pi * tau))
+
+
+def iec_sigma1(v_hub, turbulence='B'):
+    """Normal turbulence model standard deviation, IEC 61400-1 ed. 3 (6.3.1.3)."""
+    return IEC_IREF[turbulence] * (0.75 * v_hub + 5.6)
+
+
+def _turbulence_scale(hub_height):
+    return 0.7 * hub_height if hub_height <= 60 else 42.0
+
+
+def iec_eog(v_hub, t_start, wind_class='I', turbulence='B', rotor_diameter=126.0, hub_height=90.0,
+            period=10.5):
+    """
+    Extreme operating gust on a constant hub-height wind speed.
+
+    Parameters:
+    - v_hub (float): Hub-height wind speed (m/s)
+    - t_start (float): Gust start time (s)
+    - wind_class (str): IEC turbine class 'I', 'II' or 'III'
+    - turbulence (str): IEC turbulence category 'A+', 'A', 'B' or 'C'
+    - rotor_diameter (float): Rotor diameter (m), 126 for the NREL 5MW
+    - hub_height (float): Hub height (m), 90 for the NREL 5MW
+    - period (float): Gust duration (s)
+
+    Returns:
+    - Profile of wind speed
+    """
+    v_e1 = 0.8 * 1.4 * IEC_VREF[wind_class]
+    v_gust = min(1.35 * (v_e1 - v_hub),
+                 3.3 * iec_sigma1(v_hub, turbulence) / (1 + 0.1 * rotor_diameter / _turbulence_scale(hub_height)))
+    return StepProfile([-np.inf], [v_hub]) + TransientProfile(t_start, period, v_gust, _eog_shape)
+
+
+def iec_edc(v_hub, t_start, wd_init=0.0, sign=1, turbulence='B', rotor_diameter=126.0, hub_height=90.0,
+            period=6.0):
+    """
+    Extreme direction change from wd_init, held after the transient.
+
+    Parameters:
+    - v_hub (float): Hub-height wind speed (m/s), sets the size of the change
+    - t_start (float): Start of the direction change (s)
+    - wd_init (float): Wind direction before the change (deg)
+    - sign (int): +1 or -1, direction of the change
+    - turbulence, rotor_diameter, hub_height: See iec_eog
+    - period (float): Duration of the change (s)
+
+    Returns:
+    - Profile of wind direction (deg)
+    """
+    theta_e = np.rad2deg(4 * np.arctan(iec_sigma1(v_hub, turbulence)
+                                       / (v_hub * (1 + 0.1 * rotor_diameter / _turbulence_scale(hub_height)))))
+    return (StepProfile([-np.inf], [wd_init])
+            + TransientProfile(t_start, period, sign * theta_e, _edc_shape, hold=True))
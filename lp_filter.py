@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from LPF import lp_filter_block
 
 def lp_filter(input_signal, dt, corner_freq, prev_input, prev_output):
     """Simple first-order low-pass filter for a single signal."""
@@ -14,31 +15,36 @@ def lp_filter(input_signal, dt, corner_freq, prev_input, prev_output):
     
     return output, input_signal, output
 
-# Parameters
-dt = 0.01  # Time step (100 Hz sampling)
-corner_freq = 0.17952  # Corner frequency in rad/s (0.0286 Hz)
-t = np.arange(0, 100, dt)  # Time vector (0 to 100 seconds for 0.01 Hz signal)
-signal = np.sin(2 * np.pi * 0.01 * t) + 0.5 * np.random.randn(len(t))  # 0.01 Hz signal + noise
-
-# Initialize
-prev_input = 0
-prev_output = 0
-filtered = []
-
-# Apply filter
-for x in signal:
-    output, _, _ = lp_filter(x, dt, corner_freq, prev_input, prev_output)
-    filtered.append(output)
-    prev_input = x
-    prev_output = output
-
-# Plot results
-plt.figure(figsize=(10, 6))
-plt.plot(t, signal, label='Original Signal (0.01 Hz + Noise)', alpha=0.7)
-plt.plot(t, filtered, label='Filtered Signal (Low-Pass, 0.0286 Hz)', linewidth=2)
-plt.xlabel('Time (seconds)')
-plt.ylabel('Amplitude')
-plt.title('Low-Pass Filter for Yaw Controller: Original vs Filtered Signal')
-plt.legend()
-plt.grid(True)
-plt.show()
\ No newline at end of file
+
+def lp_filter_array(input_signal, dt, corner_freq, prev_input, prev_output):
+    """Vectorized lp_filter for a whole signal (or samples x channels array)."""
+    # Same return convention as lp_filter: (output, last input, last output)
+    return lp_filter_block(input_signal, dt, corner_freq, prev_input, prev_output)
+
+def main():
+    # Parameters
+    dt = 0.01  # Time step (100 Hz sampling)
+    corner_freq = 0.17952  # Corner frequency in rad/s (0.0286 Hz)
+    t = np.arange(0, 100, dt)  # Time vector (0 to 100 seconds for 0.01 Hz signal)
+    signal = np.sin(2 * np.pi * 0.01 * t) + 0.5 * np.random.randn(len(t))  # 0.01 Hz signal + noise
+
+    # Initialize
+    prev_input = 0
+    prev_output = 0
+
+    # Apply filter
+    filtered, prev_input, prev_output = lp_filter_array(signal, dt, corner_freq, prev_input, prev_output)
+
+    # Plot results
+    plt.figure(figsize=(10, 6))
+    plt.plot(t, signal, label='Original Signal (0.01 Hz + Noise)', alpha=0.7)
+    plt.plot(t, filtered, label='Filtered Signal (Low-Pass, 0.0286 Hz)', linewidth=2)
+    plt.xlabel('Time (seconds)')
+    plt.ylabel('Amplitude')
+    plt.title('Low-Pass Filter for Yaw Controller: Original vs Filtered Signal')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""
+Incremental lag / rolling-mean / EWM features for live data.
+
+OnlineFeatureEngine produces, one sample at a time and in O(1) per sample, the
+same rows as the batch pipeline in "Create lag and features by feature
+engine.py" (feature_engine LagFeatures + WindowFeatures(mean, min_periods=window)
++ pandas ewm(span, adjust=False) + next-sample target y, NaN rows dropped).
+"""
+import numpy as np
+import pandas as pd
+
+
+class OnlineFeatureEngine:
+    """
+    Ring-buffer feature engine.
+
+    Feature row of the sample at time t, per variable x:
+    - x_lag_p: x[t - p]
+    - x_window_w_mean: mean of x[t - w] .. x[t - 1] (shifted like feature_engine),
+      NaN unless all w earlier samples are valid (min_periods = w)
+    - x_ewm_s: exponentially weighted mean with span s, adjust=False; a NaN sample
+      keeps the previous value and decays its weight, as in pandas
+    - y: next sample of the target variable
+
+    A row is complete once the next sample arrives, so update() returns the row
+    of the previous sample; rows whose y, window mean or EWM is NaN are skipped,
+    like the batch pipeline's dropna. The features of the newest sample (without
+    y) are kept in last_features for live prediction.
+    """
+    def __init__(self, variables, lags=(1, 2), window=3, ewm_span=3, target=None):
+        """
+        Parameters:
+        - variables (list of str): Input variables
+        - lags (list of int): Lag periods
+        - window (int): Rolling mean window (min_periods = window)
+        - ewm_span (float): EWM span
+        - target (str, optional): Variable whose next sample is y, first variable by default
+        """
+        self.variables = list(variables)
+        self.lags = list(lags)
+        self.window = window
+        self.ewm_span = ewm_span
+        self.target = self.variables.index(self.variables[0] if target is None else target)
+
+        self.columns = (
+            self.variables
+            + [f"{var}_lag_{p}" for p in self.lags for var in self.variables]
+            + [f"{var}_window_{window}_mean" for var in self.variables]
+            + [f"{var}_ewm_{ewm_span}" for var in self.variables]
+        )
+
+        # Ring buffer of the most recent samples, one row per sample
+        self._size = max(self.lags + [window]) + 1
+        self._buffer = np.full((self._size, len(self.variables)), np.nan)
+        self._count = 0
+        # Running sum and count of the valid samples in the window
+        self._window_sum = np.zeros(len(self.variables))
+        self._window_valid = np.zeros(len(self.variables), dtype=int)
+
+        # EWM recursion as in pandas (adjust=False, ignore_na=False): _ewm_weight is the
+        # weight (1 - alpha)**k the current value keeps, k steps after the last valid sample
+        self._alpha = 2.0 / (ewm_span + 1.0)
+        self._ewm = None
+        self._ewm_weight = None
+
+        self.last_timestamp = None
+        self.last_features = None
+
+    def _past(self, p):
+        """Sample p steps before the newest one."""
+        return self._buffer[(self._count - 1 - p) % self._size]
+
+    def update(self, timestamp, values):
+        """
+        Ingest one new sample.
+
+        Parameters:
+        - timestamp: Time label of the sample
+        - values (array-like): One value per variable
+
+        Returns:
+        - (timestamp, row) of the previous sample, row being an array ordered like
+          columns + ['y'], or None while warming up
+        """
+        x = np.asarray(values, dtype=float).reshape(len(self.variables))
+
+        # The previous sample's row is complete now that its target is known
+        completed = None
+        if self.last_features is not None:
+            row = np.append(self.last_features, x[self.target])
+            n_vars = len(self.variables)
+            # Skip it when y, a window mean or an EWM is NaN (the batch pipeline's dropna)
+            if not np.isnan(row[-1]) and not np.isnan(row[-1 - 2 * n_vars:-1]).any():
+                completed = (self.last_timestamp, row)
+
+        # Push x; the window sum covers the `window` samples before the newest, NaNs skipped
+        n = self._count
+        if n >= 1:
+            entering = self._buffer[(n - 1) % self._size]
+            self._window_sum += np.nan_to_num(entering)
+            self._window_valid += ~np.isnan(entering)
+        if n >= self.window + 1:
+            leaving = self._buffer[(n - 1 - self.window) % self._size]
+            self._window_sum -= np.nan_to_num(leaving)
+            self._window_valid -= ~np.isnan(leaving)
+        if n % self.window == 0 and n >= self.window:
+            # Resynchronize the running sum to bound rounding drift (amortized O(1))
+            idx = (n - 1 - np.arange(self.window)) % self._size
+            self._window_sum = np.nansum(self._buffer[idx], axis=0)
+        self._buffer[n % self._size] = x
+        self._count = n + 1
+
+        observed = ~np.isnan(x)
+        if self._ewm is None:
+            self._ewm = x.copy()
+            self._ewm_weight = np.ones(len(x))
+        else:
+            started = ~np.isnan(self._ewm)
+            weight = np.where(started, self._ewm_weight * (1.0 - self._alpha), self._ewm_weight)
+            blend = started & observed & (self._ewm != x)
+            mixed = weight * self._ewm + (1.0 - weight) * x
+            self._ewm = np.where(blend, mixed, np.where(~started & observed, x, self._ewm))
+            self._ewm_weight = np.where(observed, 1.0, weight)
+
+        # Features of the newest sample (rows without a full window are dropped, as in the batch)
+        self.last_timestamp = timestamp
+        if n >= self.window:
+            lags = [self._past(p) if p < self._count else np.full(len(x), np.nan) for p in self.lags]
+            window_mean = np.where(self._window_valid == self.window, self._window_sum / self.window, np.nan)
+            self.last_features = np.concatenate([x] + lags + [window_mean, self._ewm])
+        else:
+            self.last_features = None
+
+        return completed
+
+    def transform(self, df):
+        """
+        Feed every row of df through update and collect the completed rows.
+
+        Equals the batch pipeline's df_final for the same input (in the original
+        column dtypes); useful to backfill or validate.
+        """
+        timestamps, rows = [], []
+        for timestamp, values in zip(df.index, df[self.variables].to_numpy(dtype=float)):
+            completed = self.update(timestamp, values)
+            if completed is not None:
+                timestamps.append(completed[0])
+                rows.append(completed[1])
+        out = pd.DataFrame(np.array(rows).reshape(len(rows), len(self.columns) + 1),
+                           index=pd.Index(timestamps, name=df.index.name), columns=self.columns + ['y'])
+        return out.astype({var: df[var].dtype for var in self.variables})
@@ -0,0 +1,283 @@
+"""
+Rotor performance tables (Cp, Ct, Cq) in the ROSCO text format, e.g. Cp_Ct_Cq.NREL5MW.txt.
+
+The text file is parsed once and stored as .npy files in a cache directory keyed
+on the SHA-256 of the file content. Later loads memory-map those arrays, so
+start-up is fast and processes loading the same table share its pages.
+"""
+import hashlib
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+# Header keyword in the text file -> table field
+SECTIONS = {
+    'Pitch angle vector': 'pitch',
+    'TSR vector': 'tsr',
+    'Wind speed vector': 'wind_speed',
+    'Power coefficient': 'Cp',
+    'Thrust coefficient': 'Ct',
+    'Torque coefficient': 'Cq',
+}
+FIELDS = tuple(SECTIONS.values())
+
+# Tables currently loaded in this process, keyed on content hash
+_loaded_tables = weakref.WeakValueDictionary()
+
+
+class RotorPerformanceTable:
+    """
+    Pitch/TSR grid and coefficient matrices of one rotor.
+
+    Attributes:
+    - pitch (array): Blade pitch angles, (deg), matrix columns
+    - tsr (array): Tip speed ratios, matrix rows
+    - wind_speed (array): Wind speed(s) the table was computed for, (m/s)
+    - Cp, Ct, Cq (array): Coefficient matrices, shape (len(tsr), len(pitch))
+    - source (str): Path of the text file
+    - digest (str): SHA-256 of the text file content
+    - cache_entry (str): Cache directory holding the binary arrays, if loaded through the cache
+    """
+    def __init__(self, arrays, source=None, digest=None, cache_entry=None):
+        for field in FIELDS:
+            setattr(self, field, arrays[field])
+        self.source = source
+        self.digest = digest
+        self.cache_entry = cache_entry
+
+    def __repr__(self):
+        return (f"RotorPerformanceTable({os.path.basename(self.source or '')!r}, "
+                f"{len(self.tsr)} TSR x {len(self.pitch)} pitch)")
+
+    def surface(self, field, pitch_units='rad', out_of_range='clamp'):
+        """
+        Interpolation surface of one coefficient table.
+
+        Parameters:
+        - field (str): 'Cp', 'Ct' or 'Cq'
+        - pitch_units (str): 'rad' (as used by the simulation and ROSCO) or 'deg'
+        - out_of_range (str): 'clamp' or 'extrapolate', see RotorSurface
+
+        Returns:
+        - RotorSurface
+        """
+        pitch = np.deg2rad(self.pitch) if pitch_units == 'rad' else self.pitch
+        return RotorSurface(pitch, self.tsr, getattr(self, field), out_of_range)
+
+
+class RotorSurface:
+    """
+    Bilinear interpolation on a rotor performance table, precomputed per cell.
+
+    The four bilinear coefficients of every grid cell are computed once, so a
+    query only has to find its cell (a division on uniform grids) and evaluate
+    one polynomial. Results equal ROSCO's RotorPerformance.interp_surface,
+    which rebuilds a linear RectBivariateSpline on every call.
+
+    Queries outside the grid are either clamped to the grid edge ('clamp',
+    the ROSCO behaviour) or linearly extrapolated from the edge cell ('extrapolate').
+    """
+    def __init__(self, pitch, tsr, table, out_of_range='clamp'):
+        """
+        Parameters:
+        - pitch (array): Pitch grid, matrix columns (same units as the queries)
+        - tsr (array): TSR grid, matrix rows
+        - table (array): Coefficients, shape (len(tsr), len(pitch))
+        - out_of_range (str): 'clamp' or 'extrapolate'
+        """
+        if out_of_range not in ('clamp', 'extrapolate'):
+            raise ValueError(f"out_of_range must be 'clamp' or 'extrapolate', not {out_of_range!r}")
+        self.pitch = np.asarray(pitch, dtype=float)
+        self.tsr = np.asarray(tsr, dtype=float)
+        self.table = np.asarray(table, dtype=float)
+        self.clamp = out_of_range == 'clamp'
+
+        # f = c0 + c1 * dp + c2 * dl + c3 * dp * dl inside cell (tsr j, pitch i)
+        z = self.table
+        hp = np.diff(self.pitch)[None, :]
+        hl = np.diff(self.tsr)[:, None]
+        c0 = z[:-1, :-1]
+        c1 = (z[:-1, 1:] - z[:-1, :-1]) / hp
+        c2 = (z[1:, :-1] - z[:-1, :-1]) / hl
+        c3 = (z[1:, 1:] - z[1:, :-1] - z[:-1, 1:] + z[:-1, :-1]) / (hp * hl)
+        self.coef = np.stack([c0, c1, c2, c3], axis=-1)
+        # Plain-float copy for the scalar path, which avoids numpy scalar overhead
+        self._coef_list = self.coef.tolist()
+
+        # Uniform grids locate their cell by division instead of a search
+        self._pitch_step = self._uniform_step(self.pitch)
+        self._tsr_step = self._uniform_step(self.tsr)
+        self._bounds = (float(self.pitch[0]), float(self.pitch[-1]), float(self.tsr[0]), float(self.tsr[-1]))
+        self._pitch_list = self.pitch.tolist()
+        self._tsr_list = self.tsr.tolist()
+
+    @classmethod
+    def from_rosco(cls, performance, out_of_range='clamp'):
+        """Build from a ROSCO RotorPerformance object (e.g. turbine.Cq)."""
+        return cls(performance.pitch_initial_rad, performance.TSR_initial,
+                   performance.performance_table, out_of_range)
+
+    @staticmethod
+    def _uniform_step(grid):
+        step = np.diff(grid)
+        if np.allclose(step, step[0], rtol=1e-9, atol=0.0):
+            return float(step[0])
+        return None
+
+    def _cell(self, grid, step, x):
+        """Vectorized cell index of x in grid."""
+        if step is None:
+            idx = np.searchsorted(grid, x, side='right') - 1
+        else:
+            idx = np.floor((x - grid[0]) / step).astype(np.intp)
+        return np.clip(idx, 0, len(grid) - 2)
+
+    def interp(self, pitch, tsr):
+        """
+        Interpolate at (pitch, tsr) pairs.
+
+        Parameters:
+        - pitch (float or array): Blade pitch
+        - tsr (float or array): Tip speed ratio, broadcast against pitch
+
+        Returns:
+        - float for scalar queries, otherwise array of the broadcast shape
+        """
+        if np.ndim(pitch) == 0 and np.ndim(tsr) == 0:
+            return self._interp_scalar(float(pitch), float(tsr))
+
+        pitch, tsr = np.broadcast_arrays(np.asarray(pitch, dtype=float), np.asarray(tsr, dtype=float))
+        if self.clamp:
+            pitch = np.clip(pitch, self.pitch[0], self.pitch[-1])
+            tsr = np.clip(tsr, self.tsr[0], self.tsr[-1])
+        i = self._cell(self.pitch, self._pitch_step, pitch)
+        j = self._cell(self.tsr, self._tsr_step, tsr)
+        dp = pitch - self.pitch[i]
+        dl = tsr - self.tsr[j]
+        c = self.coef[j, i]
+        return c[..., 0] + c[..., 1] * dp + c[..., 2] * dl + c[..., 3] * dp * dl
+
+    def _interp_scalar(self, pitch, tsr):
+        p0, p1, l0, l1 = self._bounds
+        if self.clamp:
+            pitch = min(max(pitch, p0), p1)
+            tsr = min(max(tsr, l0), l1)
+        i = self._cell_scalar(self._pitch_list, self._pitch_step, pitch)
+        j = self._cell_scalar(self._tsr_list, self._tsr_step, tsr)
+        dp = pitch - self._pitch_list[i]
+        dl = tsr - self._tsr_list[j]
+        c0, c1, c2, c3 = self._coef_list[j][i]
+        return c0 + c1 * dp + c2 * dl + c3 * dp * dl
+
+    @staticmethod
+    def _cell_scalar(grid, step, x):
+        if step is None:
+            lo, hi = 0, len(grid) - 2
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if grid[mid] <= x:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            return lo
+        return min(max(int((x - grid[0]) // step), 0), len(grid) - 2)
+
+    def interp_surface(self, pitch, TSR):
+        """
+        Drop-in replacement for ROSCO's RotorPerformance.interp_surface.
+
+        Evaluates the grid pitch x TSR and squeezes the result, so the
+        simulation's interp_surface([bld_pitch], tsr) call returns a scalar.
+        """
+        pitch = np.atleast_1d(pitch)
+        TSR = np.atleast_1d(TSR)
+        if pitch.size == 1 and TSR.size == 1:
+            return self._interp_scalar(float(pitch[0]), float(TSR[0]))
+        return np.squeeze(self.interp(pitch[:, None], TSR[None, :]))
+
+
+def parse_rotor_performance(path):
+    """
+    Parse a ROSCO-format rotor performance text file.
+
+    Parameters:
+    - path (str): Path of the text file
+
+    Returns:
+    - dict of arrays with keys pitch, tsr, wind_speed, Cp, Ct, Cq
+    """
+    rows = {field: [] for field in FIELDS}
+    field = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                field = next((name for key, name in SECTIONS.items() if key in line), field)
+                continue
+            if field is None:
+                raise ValueError(f"{path}: data found before any section header")
+            rows[field].append([float(v) for v in line.split()])
+
+    arrays = {}
+    for field in ('pitch', 'tsr', 'wind_speed'):
+        arrays[field] = np.array([v for row in rows[field] for v in row])
+    for field in ('Cp', 'Ct', 'Cq'):
+        arrays[field] = np.array(rows[field])
+        if arrays[field].shape != (len(arrays['tsr']), len(arrays['pitch'])):
+            raise ValueError(f"{path}: {field} table has shape {arrays[field].shape}, expected "
+                             f"({len(arrays['tsr'])}, {len(arrays['pitch'])})")
+    return arrays
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's content."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_rotor_performance(path, cache_dir=None):
+    """
+    Load a rotor performance table through the binary cache.
+
+    Parameters:
+    - path (str): Path of the ROSCO-format text file
+    - cache_dir (str, optional): Cache directory, '.rotor_cache' next to the text file by default
+
+    Returns:
+    - RotorPerformanceTable with read-only, memory-mapped arrays
+    """
+    digest = file_digest(path)
+    table = _loaded_tables.get(digest)
+    if table is not None:
+        return table
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), '.rotor_cache')
+    entry = os.path.join(cache_dir, digest)
+
+    if not all(os.path.exists(os.path.join(entry, field + '.npy')) for field in FIELDS):
+        arrays = parse_rotor_performance(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write into a scratch directory and rename, so readers never see a partial entry
+        scratch = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+        for field in FIELDS:
+            np.save(os.path.join(scratch, field + '.npy'), arrays[field])
+        try:
+            os.rename(scratch, entry)
+        except OSError:
+            # Another process stored the same entry first
+            for name in os.listdir(scratch):
+                os.remove(os.path.join(scratch, name))
+            os.rmdir(scratch)
+
+    arrays = {field: np.load(os.path.join(entry, field + '.npy'), mmap_mode='r') for field in FIELDS}
+    table = RotorPerformanceTable(arrays, source=path, digest=digest, cache_entry=entry)
+    _loaded_tables[digest] = table
+    return table
@@ -0,0 +1,168 @@
+"""
+Content-addressed result cache for sim_ws_wd_series.
+
+A run is identified by a SHA-256 over everything that determines its outputs:
+the t/ws/wd arrays (dtype, shape and bytes), the initial conditions, the
+public numeric parameters of the turbine (including its Cq/Cp/Ct tables) and
+the controller identity (its class, and the content of its library and
+parameter files, or for other controllers its source code and public
+attributes). The output arrays are stored in <cache_dir>/<key>.npz; a hit sets
+them on the simulation object without running the time loop. Entries are written atomically and evicted least recently used
+first when the directory exceeds its size budget.
+"""
+import hashlib
+import inspect
+import numbers
+import os
+import types
+import zipfile
+
+import numpy as np
+
+from fast_loader import evict_cache
+from rotor_performance import file_digest
+from sim_ensemble import OUTPUTS
+from untitled10 import sim_ws_wd_series, plot_ws_wd_series
+
+CACHE_VERSION = 1
+
+# Controller attributes naming files whose content defines the controller (ROSCO ControllerInterface)
+CONTROLLER_FILES = ('lib_name', 'param_filename')
+
+
+def _update_value(h, name, value, depth):
+    if value is None or isinstance(value, (numbers.Number, str, bool)):
+        h.update(f"{name}={value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        h.update(f"{name}:{value.dtype.str}{value.shape};".encode())
+        h.update(value.tobytes())
+    elif isinstance(value, (list, tuple)) and all(isinstance(v, (numbers.Number, str)) for v in value):
+        h.update(f"{name}={list(value)!r};".encode())
+    elif isinstance(value, dict) and depth > 0:
+        for k in sorted(value, key=str):
+            _update_value(h, f"{name}.{k}", value[k], depth - 1)
+    elif depth > 0 and hasattr(value, '__dict__') and not isinstance(value, types.ModuleType):
+        _update_object(h, name, value, depth - 1)
+
+
+def _update_object(h, prefix, obj, depth):
+    h.update(f"{prefix}:{type(obj).__module__}.{type(obj).__qualname__};".encode())
+    for name in sorted(dir(obj)):
+        if name.startswith('_'):
+            continue
+        try:
+            value = getattr(obj, name)
+        except Exception:
+            continue
+        if callable(value):
+            continue
+        _update_value(h, f"{prefix}.{name}", value, depth)
+
+
+def turbine_fingerprint(turbine):
+    """Digest of the turbine's public scalars, strings and arrays, one level into sub-objects (e.g. Cq)."""
+    h = hashlib.sha256()
+    _update_object(h, 'turbine', turbine, depth=1)
+    return h.hexdigest()
+
+
+def controller_fingerprint(controller_int, controller_id=None):
+    """
+    Digest of the controller identity.
+
+    A controller with the files in CONTROLLER_FILES (ROSCO) is identified by its
+    class and their content; its other attributes change while it runs. Any other
+    controller (e.g. a Python stub) is identified by its class source code and its
+    public scalars and arrays, so edited code or gains change the key; take the key
+    before running it, as cached_sim_ws_wd_series does. controller_id is always
+    added, to distinguish controllers that differ otherwise.
+    """
+    cls = type(controller_int)
+    h = hashlib.sha256()
+    h.update(f"{cls.__module__}.{cls.__qualname__};".encode())
+    known = False
+    for name in CONTROLLER_FILES:
+        path = getattr(controller_int, name, None)
+        if isinstance(path, (str, os.PathLike)) and os.path.isfile(path):
+            h.update(f"{name}={file_digest(path)};".encode())
+            known = True
+        elif path is not None:
+            h.update(f"{name}={path!r};".encode())
+            known = True
+    if not known:
+        try:
+            h.update(inspect.getsource(cls).encode())
+        except (OSError, TypeError):
+            pass  # Built-in or interactively defined class: attributes and controller_id only
+        _update_object(h, 'controller', controller_int, depth=0)
+    h.update(f"id={controller_id!r};".encode())
+    return h.hexdigest()
+
+
+def sim_cache_key(sim, t_array, ws_array, wd_array, rotor_rpm_init=10, init_pitch=0.0, init_yaw=None,
+                  controller_id=None):
+    """SHA-256 hex key of a sim_ws_wd_series run; see the module docstring for what it covers."""
+    h = hashlib.sha256(f"sim_ws_wd_series v{CACHE_VERSION};".encode())
+    for name, array in (('t', t_array), ('ws', ws_array), ('wd', wd_array)):
+        _update_value(h, name, np.asarray(array), depth=0)
+    for name, value in (('rotor_rpm_init', rotor_rpm_init), ('init_pitch', init_pitch), ('init_yaw', init_yaw)):
+        h.update(f"{name}={None if value is None else float(value)!r};".encode())
+    h.update(turbine_fingerprint(sim.turbine).encode())
+    h.update(controller_fingerprint(sim.controller_int, controller_id).encode())
+    return h.hexdigest()
+
+
+def _load_entry(path, key):
+    try:
+        with np.load(path) as data:
+            if str(data['key']) != key:
+                return None
+            return {name: data[name] for name in OUTPUTS}
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        return None
+
+
+def cached_sim_ws_wd_series(sim, t_array, ws_array, wd_array, rotor_rpm_init=10, init_pitch=0.0, init_yaw=None,
+                            make_plots=False, cache_dir='sim_cache', max_cache_bytes=1024**3, controller_id=None,
+                            verbose=False):
+    """
+    sim_ws_wd_series through the result cache.
+
+    Parameters:
+    - sim: Simulation object with turbine and controller_int (e.g. a ROSCO Sim)
+    - t_array, ws_array, wd_array, rotor_rpm_init, init_pitch, init_yaw: See sim_ws_wd_series
+    - make_plots (bool): Plot the results, on a hit as well
+    - cache_dir (str): Cache directory
+    - max_cache_bytes (int): Size budget of cache_dir, least recently used entries are evicted
+    - controller_id (str, optional): Extra controller identity, see controller_fingerprint
+    - verbose (bool): Passed to sim_ws_wd_series on a miss
+
+    Returns:
+    - True if the outputs came from the cache; either way they are set on sim as
+      sim_ws_wd_series does
+    """
+    key = sim_cache_key(sim, t_array, ws_array, wd_array, rotor_rpm_init, init_pitch, init_yaw, controller_id)
+    path = os.path.join(cache_dir, key + '.npz')
+
+    outputs = _load_entry(path, key) if os.path.exists(path) else None
+    hit = outputs is not None
+    if hit:
+        os.utime(path)  # Mark as recently used
+        for name, value in outputs.items():
+            setattr(sim, name, value)
+        sim.t_array = t_array
+        sim.ws_array = ws_array
+        sim.wd_array = wd_array
+        if make_plots:
+            plot_ws_wd_series(sim)
+        return hit
+
+    sim_ws_wd_series(sim, t_array, ws_array, wd_array, rotor_rpm_init=rotor_rpm_init, init_pitch=init_pitch,
+                     init_yaw=init_yaw, make_plots=make_plots, verbose=verbose)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f".{key}.{os.getpid()}.tmp.npz")
+    np.savez(tmp, key=np.array(key), **{name: np.asarray(getattr(sim, name)) for name in OUTPUTS})
+    os.replace(tmp, path)
+    evict_cache(cache_dir, max_cache_bytes, keep=(path,), pattern='*.npz')
+    return hit
@@ -0,0 +1,119 @@
+"""
+Long farm simulations with chunked Parquet output and resumable checkpoints.
+
+The simulation advances chunk_steps time steps at a time. Each chunk is written
+as its own Parquet part file (one row group) and dropped from memory, and the
+complete turbine and controller state (the pickled FarmSimulation) is
+checkpointed periodically. A crashed run restarts from the last checkpoint.
+
+Only the native FarmSimulation can be checkpointed: the internal state of a
+compiled controller behind sim_ws_wd_series is not accessible.
+"""
+import glob
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from farm_sim import OUTPUTS, FarmSimulation
+
+# Leading underscore: ignored by Parquet dataset readers of out_dir
+CHECKPOINT_NAME = '_checkpoint.pkl'
+
+
+def _part_path(out_dir, part):
+    return os.path.join(out_dir, f'part-{part:05d}.parquet')
+
+
+def _write_part(path, t, ws, wd, out):
+    n_steps, n_turbines = ws.shape
+    columns = {
+        'time': np.repeat(t, n_turbines),
+        'turbine': np.tile(np.arange(n_turbines), n_steps),
+        'ws': ws.ravel(),
+        'wd': wd.ravel(),
+    }
+    for name in OUTPUTS:
+        columns[name] = out[name].ravel()
+    tmp = path + '.tmp'
+    pq.write_table(pa.table(columns), tmp, row_group_size=len(columns['time']))
+    os.replace(tmp, path)
+
+
+def _save_checkpoint(out_dir, sim, next_step, next_part):
+    path = os.path.join(out_dir, CHECKPOINT_NAME)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump({'sim': sim, 'next_step': next_step, 'next_part': next_part}, f)
+    os.replace(path + '.tmp', path)
+
+
+def simulate_farm_chunked(turbine, t_array, ws_array, wd_array, out_dir, chunk_steps=60000,
+                          checkpoint_every=1, rotor_rpm_init=10, init_pitch=0.0, init_yaw=None,
+                          controller=None):
+    """
+    Run simulate_farm with bounded memory, streaming outputs to out_dir.
+
+    If out_dir holds a checkpoint, the run resumes from it; part files written
+    after that checkpoint are discarded and recomputed.
+
+    Parameters:
+    - turbine, rotor_rpm_init, init_pitch, init_yaw, controller: See farm_sim.simulate_farm
+    - t_array (array): Time steps [s]
+    - ws_array, wd_array (array): Wind speed [m/s] and direction [deg], shape (n_steps,) or
+      (n_steps, n_turbines); may be memory-mapped (np.load(..., mmap_mode='r')), only
+      one chunk is read at a time
+    - out_dir (str): Output directory for part-*.parquet files and the checkpoint
+    - chunk_steps (int): Time steps per part file
+    - checkpoint_every (int): Checkpoint after this many part files
+
+    Returns:
+    - list of part file paths, in time order (read them with read_farm_output)
+    """
+    n_steps = len(t_array)
+    one_turbine = np.ndim(ws_array) == 1
+
+    def block(array, start, stop):
+        array = np.asarray(array[start:stop], dtype=float)
+        return array[:, None] if one_turbine else array
+
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = os.path.join(out_dir, CHECKPOINT_NAME)
+    if os.path.exists(checkpoint):
+        with open(checkpoint, 'rb') as f:
+            saved = pickle.load(f)
+        sim, step, part = saved['sim'], saved['next_step'], saved['next_part']
+        for path in glob.glob(os.path.join(out_dir, 'part-*.parquet')):
+            if int(os.path.basename(path)[5:10]) >= part:
+                os.remove(path)
+    else:
+        wd_init = block(wd_array, 0, 1)[0]
+        sim = FarmSimulation(turbine, len(wd_init), t_array[1] - t_array[0], wd_init,
+                             rotor_rpm_init, init_pitch, init_yaw, controller)
+        step, part = 0, 0
+
+    while step < n_steps:
+        stop = min(step + chunk_steps, n_steps)
+        ws, wd = block(ws_array, step, stop), block(wd_array, step, stop)
+        if step == 0:
+            # First row holds the initial conditions, as in simulate_farm
+            initial = {name: value.copy() for name, value in sim.state.items()}
+            out = sim.run(ws[1:], wd[1:])
+            out = {name: np.vstack([initial[name][None, :], out[name]]) for name in OUTPUTS}
+        else:
+            out = sim.run(ws, wd)
+
+        _write_part(_part_path(out_dir, part), np.asarray(t_array[step:stop]), ws, wd, out)
+        step, part = stop, part + 1
+        if part % checkpoint_every == 0 or step == n_steps:
+            _save_checkpoint(out_dir, sim, step, part)
+
+    return [_part_path(out_dir, i) for i in range(part)]
+
+
+def read_farm_output(out_dir, columns=None):
+    """Read the part files written by simulate_farm_chunked into one DataFrame."""
+    paths = sorted(glob.glob(os.path.join(out_dir, 'part-*.parquet')))
+    return pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
@@ -0,0 +1,80 @@
+"""
+Run sim_ws_wd_series over many wind speed / direction realizations in a process pool.
+
+Every case runs in a worker process with its own simulation object, so each
+controller instance (and the compiled library behind it) is isolated from the
+others. Results are gathered into a single columnar DataFrame with a case index.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from untitled10 import sim_ws_wd_series
+
+# Arrays stored on the simulation object by sim_ws_wd_series
+OUTPUTS = ('bld_pitch', 'rot_speed', 'gen_speed', 'aero_torque', 'gen_torque',
+           'gen_power', 'nac_yaw', 'nac_yawrate')
+
+# Set in each worker by _init_worker
+_sim_factory = None
+
+
+def _init_worker(sim_factory):
+    global _sim_factory
+    _sim_factory = sim_factory
+
+
+def _run_case(case):
+    # A fresh simulation object (and controller) per case: sim_ws_wd_series
+    # ends every run with kill_discon(), which unloads the controller
+    sim = _sim_factory()
+    sim_ws_wd_series(sim, make_plots=False, verbose=False, **case)
+    return {name: np.asarray(getattr(sim, name)) for name in OUTPUTS}
+
+
+def run_ensemble(sim_factory, cases, n_workers=None, chunksize=1):
+    """
+    Simulate a batch of cases in parallel.
+
+    Parameters:
+    - sim_factory (callable): Picklable, argument-free callable returning a new object
+      with `turbine` and `controller_int` attributes (e.g. a ROSCO Sim); called once per
+      case inside the worker process
+    - cases (list of dict): Keyword arguments of sim_ws_wd_series for every case:
+      t_array, ws_array, wd_array and optionally rotor_rpm_init, init_pitch, init_yaw
+    - n_workers (int, optional): Number of worker processes, os.cpu_count() by default;
+      1 runs the cases in this process
+    - chunksize (int): Cases sent to a worker at a time
+
+    Returns:
+    - DataFrame with columns case, time, ws, wd and one column per output array,
+      cases stacked in the order given
+    """
+    cases = list(cases)
+    if not cases:
+        return pd.DataFrame({name: np.empty(0, dtype=dtype) for name, dtype in
+                             [('case', int), ('time', float), ('ws', float), ('wd', float)]
+                             + [(name, float) for name in OUTPUTS]})
+    if n_workers is None:
+        n_workers = min(os.cpu_count() or 1, len(cases))
+
+    if n_workers <= 1:
+        _init_worker(sim_factory)
+        results = [_run_case(case) for case in cases]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(sim_factory,)) as pool:
+            results = list(pool.map(_run_case, cases, chunksize=chunksize))
+
+    lengths = [len(case['t_array']) for case in cases]
+    columns = {
+        'case': np.repeat(np.arange(len(cases)), lengths),
+        'time': np.concatenate([case['t_array'] for case in cases]),
+        'ws': np.concatenate([case['ws_array'] for case in cases]),
+        'wd': np.concatenate([case['wd_array'] for case in cases]),
+    }
+    for name in OUTPUTS:
+        columns[name] = np.concatenate([result[name] for result in results])
+    return pd.DataFrame(columns)
@@ -0,0 +1,138 @@
+"""
+Built-in stage timing for the sim_ws_wd_series time loop.
+
+Pass a SimProfiler as sim_ws_wd_series(..., profiler=SimProfiler()) to record
+cumulative time, call counts and log-binned latency histograms of the loop
+stages and of whole time steps. With profiler=None (the default) the loop only
+pays one boolean check per stage.
+"""
+import json
+import math
+from time import perf_counter
+
+import numpy as np
+
+# In loop order; every stage is lapped once per time step
+STAGES = ('yaw_error', 'cq_interp', 'rotor_dynamics', 'turbine_state', 'controller', 'outputs')
+
+# Latency histogram bins: 10 per decade from 100 ns to 1 s
+HIST_MIN_EXP = -7
+HIST_BINS_PER_DECADE = 10
+HIST_N_BINS = 7 * HIST_BINS_PER_DECADE
+
+
+class SimProfiler:
+    """
+    Per-stage timer for one or more simulation runs.
+
+    Stages:
+    - yaw_error: yaw error from the wind direction and previous nacelle yaw
+    - cq_interp: TSR and Cq table lookup
+    - rotor_dynamics: aero torque, rotor and generator speed update
+    - turbine_state: controller state dict
+    - controller: call_controller (the compiled controller boundary)
+    - outputs: power and nacelle yaw
+    """
+    def __init__(self):
+        self.total_time = dict.fromkeys(STAGES, 0.0)
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.hist = {name: [0] * HIST_N_BINS for name in STAGES + ('step',)}
+        self.step_time = 0.0
+        self.steps = 0
+        self.run_time = 0.0
+        self._run_start = None
+
+    @staticmethod
+    def now():
+        return perf_counter()
+
+    @staticmethod
+    def _bin(seconds):
+        if seconds <= 0.0:
+            return 0
+        b = int((math.log10(seconds) - HIST_MIN_EXP) * HIST_BINS_PER_DECADE)
+        return min(max(b, 0), HIST_N_BINS - 1)
+
+    def start_run(self):
+        self._run_start = perf_counter()
+
+    def end_run(self):
+        if self._run_start is not None:
+            self.run_time += perf_counter() - self._run_start
+            self._run_start = None
+
+    def lap(self, stage, tic):
+        """Charge the time since tic to stage and return the current time."""
+        now = perf_counter()
+        elapsed = now - tic
+        self.total_time[stage] += elapsed
+        self.calls[stage] += 1
+        self.hist[stage][self._bin(elapsed)] += 1
+        return now
+
+    def end_step(self, step_start):
+        """Record the latency of a whole time step."""
+        elapsed = perf_counter() - step_start
+        self.step_time += elapsed
+        self.steps += 1
+        self.hist['step'][self._bin(elapsed)] += 1
+
+    def histogram(self, name):
+        """Bin edges [s] and counts of the latency histogram of a stage or of 'step'."""
+        edges = 10.0 ** (HIST_MIN_EXP + np.arange(HIST_N_BINS + 1) / HIST_BINS_PER_DECADE)
+        return edges, np.array(self.hist[name])
+
+    def _percentile(self, name, q):
+        edges, counts = self.histogram(name)
+        if counts.sum() == 0:
+            return float('nan')
+        k = np.searchsorted(np.cumsum(counts), q / 100 * counts.sum())
+        return float(edges[k + 1])
+
+    def summary(self):
+        """
+        Summary of all recorded runs.
+
+        Returns:
+        - dict with steps, run_time [s], step_time [s], us_per_step, step_p50_us / step_p99_us
+          (histogram upper bounds) and per stage: time [s], calls, share of step time, us_per_step
+        """
+        steps = max(self.steps, 1)
+        stages = {}
+        for name in STAGES:
+            stages[name] = {
+                'time': self.total_time[name],
+                'calls': self.calls[name],
+                'share': self.total_time[name] / self.step_time if self.step_time else 0.0,
+                'us_per_step': 1e6 * self.total_time[name] / steps,
+                'p99_us': 1e6 * self._percentile(name, 99),
+            }
+        return {
+            'steps': self.steps,
+            'run_time': self.run_time,
+            'step_time': self.step_time,
+            'us_per_step': 1e6 * self.step_time / steps,
+            'step_p50_us': 1e6 * self._percentile('step', 50),
+            'step_p99_us': 1e6 * self._percentile('step', 99),
+            'stages': stages,
+        }
+
+    def report(self):
+        """Text table of the summary."""
+        s = self.summary()
+        lines = [f"{s['steps']} steps, {s['us_per_step']:.2f} us/step "
+                 f"(p50 <= {s['step_p50_us']:.2f} us, p99 <= {s['step_p99_us']:.2f} us)",
+                 f"{'stage':<16}{'time [s]':>10}{'calls':>10}{'share':>8}{'us/step':>10}{'p99 us':>10}"]
+        for name, st in s['stages'].items():
+            lines.append(f"{name:<16}{st['time']:>10.4f}{st['calls']:>10d}{st['share']:>8.1%}"
+                         f"{st['us_per_step']:>10.2f}{st['p99_us']:>10.2f}")
+        return '\n'.join(lines)
+
+    def to_json(self, path):
+        """Write the summary and the raw histograms to a JSON file."""
+        data = self.summary()
+        edges, _ = self.histogram('step')
+        data['hist_edges'] = edges.tolist()
+        data['hist'] = self.hist
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,178 @@
+"""
+Steady-state operating points and power/thrust curves from a rotor performance table.
+
+All wind speeds are solved in one vectorized pass over the Cp/Ct surfaces.
+Results are cached per table (content hash) and parameter set, in memory and
+next to the table's binary cache entry, so repeated controller setup and
+reporting do not recompute them.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from rotor_performance import RotorSurface
+
+# Bump when the solution changes, to invalidate old on-disk entries
+CACHE_VERSION = 2
+
+# Results already computed in this process, keyed like the on-disk entries
+_results = {}
+
+
+def cp_optimum(table):
+    """
+    Maximum-Cp point and per-pitch / per-TSR optima of a table.
+
+    Parameters:
+    - table (RotorPerformanceTable): Table with pitch (deg), tsr and Cp
+
+    Returns:
+    - dict with
+      cp_max, tsr_opt, pitch_opt (deg): grid point of maximum Cp,
+      tsr_opt_per_pitch, cp_max_per_pitch: optimal TSR and Cp for every pitch,
+      pitch_opt_per_tsr, cp_max_per_tsr: fine-pitch schedule (Cp-maximizing pitch) for every TSR
+    """
+    cp = np.asarray(table.Cp)
+    pitch = np.asarray(table.pitch, dtype=float)
+    tsr = np.asarray(table.tsr, dtype=float)
+    i, j = np.unravel_index(np.argmax(cp), cp.shape)
+    return {
+        'cp_max': float(cp[i, j]),
+        'tsr_opt': float(tsr[i]),
+        'pitch_opt': float(pitch[j]),
+        'tsr_opt_per_pitch': tsr[np.argmax(cp, axis=0)],
+        'cp_max_per_pitch': cp.max(axis=0),
+        'pitch_opt_per_tsr': pitch[np.argmax(cp, axis=1)],
+        'cp_max_per_tsr': cp.max(axis=1),
+    }
+
+
+def solve_power_curve(table, rotor_radius, rated_power, wind_speeds, rho=1.225, gen_eff=1.0,
+                      min_rotor_speed=0.0, max_rotor_speed=None, fine_pitch=None):
+    """
+    Steady-state operating point for every wind speed.
+
+    Below rated the rotor tracks the optimal TSR at fine pitch, limited to
+    [min_rotor_speed, max_rotor_speed]. Above rated the rotor runs at
+    max_rotor_speed and pitches (towards feather) until electrical power
+    equals rated_power. Pass the turbine's rated rotor speed as max_rotor_speed
+    (1.267 rad/s for the NREL 5MW); without it the limit is the speed at which
+    the rotor reaches rated power at maximum Cp.
+
+    Parameters:
+    - table (RotorPerformanceTable): Table with pitch (deg), tsr, Cp and Ct
+    - rotor_radius (float): Rotor radius, (m)
+    - rated_power (float): Rated electrical power, (W)
+    - wind_speeds (array): Wind speed grid, (m/s)
+    - rho (float): Air density, (kg/m^3)
+    - gen_eff (float): Generator efficiency, (-)
+    - min_rotor_speed (float): Lower rotor speed limit, (rad/s)
+    - max_rotor_speed (float, optional): Rated rotor speed, (rad/s), see above
+    - fine_pitch (float, optional): Below-rated pitch, (deg), pitch of maximum Cp by default
+
+    Returns:
+    - dict of arrays over wind_speeds: rotor_speed (rad/s), tsr, pitch (deg), cp, ct,
+      aero_power, power (electrical), thrust (N), aero_torque (Nm), and region (2 or 3)
+    """
+    v = np.asarray(wind_speeds, dtype=float)
+    pitch_grid = np.asarray(table.pitch, dtype=float)
+    optimum = cp_optimum(table)
+    if fine_pitch is None:
+        fine_pitch = optimum['pitch_opt']
+    cp_surface = RotorSurface(pitch_grid, table.tsr, table.Cp)
+    ct_surface = RotorSurface(pitch_grid, table.tsr, table.Ct)
+    area = np.pi * rotor_radius**2
+    wind_power = 0.5 * rho * area * v**3
+    if max_rotor_speed is None:
+        # Wind speed at which the optimal-TSR rotor reaches rated power
+        v_rated = (rated_power / (gen_eff * 0.5 * rho * area * optimum['cp_max']))**(1 / 3)
+        max_rotor_speed = optimum['tsr_opt'] * v_rated / rotor_radius
+
+    # Region 2: optimal TSR at fine pitch, within the rotor speed limits
+    rotor_speed = np.clip(optimum['tsr_opt'] * v / rotor_radius, min_rotor_speed, max_rotor_speed)
+    tsr = rotor_speed * rotor_radius / v
+    pitch = np.full_like(v, fine_pitch)
+    cp = cp_surface.interp(pitch, tsr)
+
+    # Region 3: find the pitch whose Cp gives rated power, on all pitch columns at once
+    region3 = wind_power * cp * gen_eff > rated_power
+    if region3.any():
+        cp_req = rated_power / (gen_eff * wind_power[region3])
+        cp_cols = cp_surface.interp(pitch_grid[None, :], tsr[region3][:, None])
+        below = (pitch_grid[None, :] >= fine_pitch) & (cp_cols <= cp_req[:, None])
+        k = np.argmax(below, axis=1)
+        k = np.where(below.any(axis=1), np.maximum(k, 1), len(pitch_grid) - 1)
+        rows = np.arange(len(k))
+        cp_lo, cp_hi = cp_cols[rows, k - 1], cp_cols[rows, k]
+        frac = np.clip((cp_lo - cp_req) / (cp_lo - cp_hi), 0.0, 1.0)
+        pitch[region3] = np.maximum(pitch_grid[k - 1] + frac * (pitch_grid[k] - pitch_grid[k - 1]), fine_pitch)
+        cp[region3] = cp_surface.interp(pitch[region3], tsr[region3])
+
+    ct = ct_surface.interp(pitch, tsr)
+    aero_power = wind_power * cp
+    return {
+        'wind_speed': v,
+        'rotor_speed': rotor_speed,
+        'tsr': tsr,
+        'pitch': pitch,
+        'cp': cp,
+        'ct': ct,
+        'aero_power': aero_power,
+        'power': aero_power * gen_eff,
+        'thrust': 0.5 * rho * area * v**2 * ct,
+        'aero_torque': aero_power / rotor_speed,
+        'region': np.where(region3, 3, 2),
+    }
+
+
+def steady_state_operating_points(table, rotor_radius, rated_power, wind_speeds=None, **kwargs):
+    """
+    Cached cp_optimum and solve_power_curve results for a table.
+
+    Parameters:
+    - table (RotorPerformanceTable): Table, ideally loaded with load_rotor_performance
+    - rotor_radius, rated_power, kwargs: See solve_power_curve
+    - wind_speeds (array, optional): Wind speed grid, 3 to 25 m/s in 0.01 m/s steps by default
+
+    Returns:
+    - dict with the keys of cp_optimum and solve_power_curve; the arrays are copies,
+      so changing them does not affect later calls
+    """
+    if wind_speeds is None:
+        wind_speeds = np.arange(3.0, 25.0 + 1e-9, 0.01)
+    wind_speeds = np.asarray(wind_speeds, dtype=float)
+
+    h = hashlib.sha256()
+    h.update(json.dumps([CACHE_VERSION, table.digest, rotor_radius, rated_power, sorted(kwargs.items())],
+                        default=float).encode())
+    if table.digest is None:
+        # Not loaded from a file: key on the arrays the solution depends on
+        for name in ('pitch', 'tsr', 'Cp', 'Ct'):
+            array = np.ascontiguousarray(getattr(table, name), dtype=float)
+            h.update(f'{name}{array.shape};'.encode())
+            h.update(array.tobytes())
+    h.update(wind_speeds.tobytes())
+    key = h.hexdigest()[:32]
+
+    result = _results.get(key)
+    if result is not None:
+        return {name: np.copy(value) if isinstance(value, np.ndarray) else value for name, value in result.items()}
+
+    path = None
+    if table.digest is not None and getattr(table, 'cache_entry', None):
+        path = os.path.join(table.cache_entry, f'steady_state-{key}.npz')
+    if path is not None and os.path.exists(path):
+        with np.load(path) as data:
+            result = {name: (data[name].item() if data[name].ndim == 0 else data[name]) for name in data.files}
+    else:
+        result = cp_optimum(table)
+        result.update(solve_power_curve(table, rotor_radius, rated_power, wind_speeds, **kwargs))
+        if path is not None:
+            tmp = path + f'.{os.getpid()}.tmp.npz'
+            np.savez(tmp, **result)
+            os.replace(tmp, path)
+
+    _results[key] = result
+    return {name: np.copy(value) if isinstance(value, np.ndarray) else value for name, value in result.items()}
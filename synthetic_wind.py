@@ -0,0 +1,168 @@
+"""
+Synthetic turbulent hub-height wind speed and direction for sim_ws_wd_series.
+
+The longitudinal (u) and lateral (v) turbulence are drawn from the IEC 61400-1
+Kaimal spectra with random phases: one inverse real FFT turns the spectral
+amplitudes of every seed and component into time series at once. Wind speed is
+the horizontal magnitude hypot(V + u, v) and direction wd_mean + atan2(v, V + u).
+
+Realizations are deterministic in (spectrum parameters, seed, dt, duration) and
+cached on that key in memory (LRU, bounded in bytes) and, optionally, as .npy
+files in a directory so repeated sweeps reload them instead of regenerating.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from input_profiles import iec_sigma1
+
+MEMORY_CACHE_BYTES = 512 * 1024**2
+_cache = OrderedDict()
+
+
+def clear_cache():
+    """Drop all in-memory realizations."""
+    _cache.clear()
+
+
+def kaimal_spectrum(f, v_hub, sigma, length_scale):
+    """
+    One-sided Kaimal spectrum, IEC 61400-1 ed. 3 (B.2).
+
+    Parameters:
+    - f (array): Frequencies (Hz)
+    - v_hub (float): Mean hub-height wind speed (m/s)
+    - sigma (float): Standard deviation of the component (m/s)
+    - length_scale (float): Integral length scale of the component (m)
+
+    Returns:
+    - spectral density ((m/s)^2/Hz)
+    """
+    return 4 * sigma**2 * length_scale / v_hub / (1 + 6 * f * length_scale / v_hub)**(5 / 3)
+
+
+def kaimal_parameters(v_hub, turbulence='B', sigma_u=None, hub_height=90.0):
+    """
+    IEC Kaimal parameters of the u and v components.
+
+    Parameters:
+    - v_hub (float): Mean hub-height wind speed (m/s)
+    - turbulence (str): IEC turbulence category, used when sigma_u is None
+    - sigma_u (float, optional): Longitudinal standard deviation (m/s)
+    - hub_height (float): Hub height (m), sets the turbulence scale parameter
+
+    Returns:
+    - dict with v_hub, sigma_u, sigma_v, length_u, length_v
+    """
+    sigma_u = iec_sigma1(v_hub, turbulence) if sigma_u is None else sigma_u
+    scale = 0.7 * hub_height if hub_height <= 60 else 42.0
+    return {'v_hub': float(v_hub), 'sigma_u': float(sigma_u), 'sigma_v': 0.8 * float(sigma_u),
+            'length_u': 8.1 * scale, 'length_v': 2.7 * scale}
+
+
+def _key(params, seed, dt, n_steps):
+    return json.dumps({'model': 'kaimal', **params, 'seed': int(seed), 'dt': float(dt), 'n': int(n_steps)},
+                      sort_keys=True)
+
+
+def _remember(key, uv):
+    _cache[key] = uv
+    _cache.move_to_end(key)
+    total = sum(a.nbytes for a in _cache.values())
+    while total > MEMORY_CACHE_BYTES and len(_cache) > 1:
+        _, old = _cache.popitem(last=False)
+        total -= old.nbytes
+
+
+def _disk_path(cache_dir, key):
+    return os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest()[:32] + '.npy')
+
+
+def _generate(params, seeds, dt, n_steps):
+    """u and v turbulence of every seed, (n_seeds, 2, n_steps), from one batched irfft."""
+    f = np.fft.rfftfreq(n_steps, dt)
+    df = f[1] - f[0]
+    amp = np.zeros((2, len(f)))
+    amp[0, 1:] = np.sqrt(kaimal_spectrum(f[1:], params['v_hub'], params['sigma_u'], params['length_u']) * df / 2)
+    amp[1, 1:] = np.sqrt(kaimal_spectrum(f[1:], params['v_hub'], params['sigma_v'], params['length_v']) * df / 2)
+    if n_steps % 2 == 0:
+        amp[:, -1] = 0  # Nyquist bin has no phase freedom
+    # Phases from each seed's own generator, so a realization does not depend on its batch
+    phase = np.stack([np.random.default_rng(seed).uniform(0, 2 * np.pi, (2, len(f))) for seed in seeds])
+    return np.fft.irfft(n_steps * amp * np.exp(1j * phase), n=n_steps, axis=-1)
+
+
+def turbulence_uv(seeds, dt, duration, v_hub, turbulence='B', sigma_u=None, hub_height=90.0, cache_dir=None):
+    """
+    Kaimal u and v turbulence for many seeds, through the realization cache.
+
+    Parameters:
+    - seeds (int or list of int): Random seeds, one realization each
+    - dt (float): Time step (s)
+    - duration (float): Length of the series (s)
+    - v_hub, turbulence, sigma_u, hub_height: See kaimal_parameters
+    - cache_dir (str, optional): Directory of .npy realizations shared across runs
+
+    Returns:
+    - array (n_seeds, 2, n_steps) of u and v fluctuations (m/s)
+    """
+    seeds = np.atleast_1d(seeds).tolist()
+    n_steps = int(round(duration / dt))
+    params = kaimal_parameters(v_hub, turbulence, sigma_u, hub_height)
+    keys = [_key(params, seed, dt, n_steps) for seed in seeds]
+
+    found = {}
+    for key in keys:
+        if key in _cache:
+            _cache.move_to_end(key)
+            found[key] = _cache[key]
+        elif cache_dir is not None and os.path.exists(_disk_path(cache_dir, key)):
+            found[key] = np.load(_disk_path(cache_dir, key), mmap_mode='r')
+            _remember(key, found[key])
+
+    missing = [(seed, key) for seed, key in zip(seeds, keys) if key not in found]
+    if missing:
+        uv = _generate(params, [seed for seed, _ in missing], dt, n_steps)
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        for (_, key), realization in zip(missing, uv):
+            # Own copy: a view would keep the whole batch alive after its entry is evicted
+            realization = realization.copy()
+            realization.setflags(write=False)
+            found[key] = realization
+            _remember(key, realization)
+            if cache_dir is not None:
+                path = _disk_path(cache_dir, key)
+                tmp = path + '.tmp.npy'
+                np.save(tmp, realization)
+                os.replace(tmp, path)
+    return np.stack([found[key] for key in keys])
+
+
+def turbulent_wind(seeds, dt, duration, v_hub, wd_mean=0.0, turbulence='B', sigma_u=None, hub_height=90.0,
+                   cache_dir=None):
+    """
+    Turbulent wind speed and direction series ready for sim_ws_wd_series.
+
+    Parameters:
+    - seeds (int or list of int): Random seeds, one case each
+    - dt (float): Time step (s)
+    - duration (float): Length of the series (s)
+    - v_hub (float): Mean hub-height wind speed (m/s)
+    - wd_mean (float): Mean wind direction (deg)
+    - turbulence (str): IEC turbulence category 'A+', 'A', 'B' or 'C'
+    - sigma_u (float, optional): Longitudinal standard deviation, from the IEC category if None
+    - hub_height (float): Hub height (m)
+    - cache_dir (str, optional): Directory of .npy realizations shared across runs
+
+    Returns:
+    - t_array (n_steps,), ws_array (n_seeds, n_steps) in m/s, wd_array (n_seeds, n_steps) in deg
+    """
+    uv = turbulence_uv(seeds, dt, duration, v_hub, turbulence, sigma_u, hub_height, cache_dir)
+    along = v_hub + uv[:, 0]
+    ws = np.hypot(along, uv[:, 1])
+    wd = wd_mean + np.rad2deg(np.arctan2(uv[:, 1], along))
+    return dt * np.arange(uv.shape[-1]), ws, wd
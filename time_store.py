@@ -0,0 +1,117 @@
+"""
+Time-range indexed Parquet store for simulation and SCADA logs.
+
+write_time_store sorts a frame by Time and writes it in row groups with column
+statistics, plus a small sidecar index (<path>.index.json) holding the Time
+range of every row group. TimeStore.query then reads only the row groups that
+overlap the requested window, and only the requested channels, through a
+memory-mapped file.
+"""
+import json
+import os
+
+import numpy as np
+import pyarrow.parquet as pq
+
+
+def _index_path(path):
+    return path + '.index.json'
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def write_time_store(df, path, row_group_size=100000, time_column='Time', compression='snappy'):
+    """
+    Write df sorted by time_column, with row-group statistics and a sidecar index.
+
+    Parameters:
+    - df (DataFrame): Data with a numeric time column
+    - path (str): Parquet file to write
+    - row_group_size (int): Rows per row group (the granularity of range reads)
+    - time_column (str): Time column
+    - compression (str): Parquet compression codec
+    """
+    df = df.sort_values(time_column, kind='stable')
+    tmp = path + '.tmp'
+    df.to_parquet(tmp, engine='pyarrow', index=False, compression=compression,
+                  row_group_size=row_group_size, write_statistics=True)
+    os.replace(tmp, path)
+    build_index(path, time_column)
+
+
+def build_index(path, time_column='Time'):
+    """(Re)build the sidecar index of a Parquet file sorted by time_column from its row-group statistics."""
+    meta = pq.ParquetFile(path).metadata
+    col = meta.schema.to_arrow_schema().get_field_index(time_column)
+    groups = []
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(col).statistics
+        groups.append({'min': stats.min, 'max': stats.max, 'num_rows': meta.row_group(i).num_rows})
+    index = {'time_column': time_column, 'source': _file_signature(path),
+             'columns': meta.schema.to_arrow_schema().names, 'row_groups': groups}
+    with open(_index_path(path) + '.tmp', 'w') as f:
+        json.dump(index, f)
+    os.replace(_index_path(path) + '.tmp', _index_path(path))
+    return index
+
+
+class TimeStore:
+    """
+    Read side of a store written by write_time_store.
+
+    Keeps the file memory-mapped and the index loaded, so repeated
+    interactive queries only pay for the row groups they touch.
+    """
+    def __init__(self, path, time_column='Time'):
+        self.path = path
+        index = None
+        if os.path.exists(_index_path(path)):
+            with open(_index_path(path)) as f:
+                index = json.load(f)
+        if (index is None or index['source'] != _file_signature(path)
+                or index['time_column'] != time_column):
+            index = build_index(path, time_column)
+        self.time_column = time_column
+        self.columns = index['columns']
+        self.t_min = np.array([g['min'] for g in index['row_groups']], dtype=float)
+        self.t_max = np.array([g['max'] for g in index['row_groups']], dtype=float)
+        self.file = pq.ParquetFile(path, memory_map=True)
+
+    def row_groups(self, t0=None, t1=None):
+        """Indices of the row groups overlapping [t0, t1]."""
+        # Groups are time-sorted, so both bounds are monotonic
+        first = 0 if t0 is None else int(np.searchsorted(self.t_max, t0, side='left'))
+        last = len(self.t_min) if t1 is None else int(np.searchsorted(self.t_min, t1, side='right'))
+        return list(range(first, last))
+
+    def query(self, columns=None, t0=None, t1=None):
+        """
+        Channels `columns` for time_column in [t0, t1].
+
+        Parameters:
+        - columns (list of str, optional): Channels to read, all if None
+        - t0, t1 (float, optional): Inclusive time window, open-ended if None
+
+        Returns:
+        - DataFrame with time_column and the requested channels
+        """
+        if columns is not None:
+            columns = [self.time_column] + [c for c in columns if c != self.time_column]
+        groups = self.row_groups(t0, t1)
+        table = self.file.read_row_groups(groups, columns=columns)
+        df = table.to_pandas()
+        time = df[self.time_column].to_numpy()
+        mask = np.ones(len(df), dtype=bool)
+        if t0 is not None:
+            mask &= time >= t0
+        if t1 is not None:
+            mask &= time <= t1
+        return df[mask].reset_index(drop=True)
+
+
+def read_time_range(path, columns=None, t0=None, t1=None, time_column='Time'):
+    """One-off TimeStore(path).query(columns, t0, t1)."""
+    return TimeStore(path, time_column).query(columns, t0, t1)
@@ -1,8 +1,19 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Unit conversions, as in rosco.toolbox.sim
+deg2rad = np.deg2rad(1)
+rad2deg = np.rad2deg(1)
+rpm2RadSec = 2.0*(np.pi)/60.0
+
+
 def sim_ws_wd_series(self, t_array, ws_array, wd_array,
                      rotor_rpm_init=10,
                      init_pitch=0.0,
                      init_yaw=None,
-                     make_plots=True):
+                     make_plots=True,
+                     verbose=True,
+                     profiler=None):
     '''
     Simulate simplified turbine model using a complied controller (.dll or similar).
         - currently a 1DOF rotor model
@@ -24,6 +35,12 @@ def sim_ws_wd_series(self, t_array, ws_array, wd_array,
              i.e., the yaw angle is set to the initial wind direction (deg)
         make_plots: bool, optional
              True: generate plots, False: don't. 
+        verbose: bool, optional
+             True: print the yaw error every time step, False: no per-step
+             output (use for production runs).
+        profiler: SimProfiler, optional
+             If given, time the loop stages (see sim_profiler.STAGES), each once
+             per time step; the summary is stored in self.profile.
     '''
 
     # Store turbine data for convenience
@@ -49,67 +66,91 @@ def sim_ws_wd_series(self, t_array, ws_array, wd_array,
     nac_yawrate = np.ones_like(t_array) * 0.0   #?
     
     
-    #function for calculate yaw_error
-    def yaw_error(wind_dir, nacelle_dir):
-        error = wind_dir - nacelle_dir
-        error = ((error + 180) % 360) - 180
-        return error
-        
+    # Loop invariants, looked up once instead of every time step
+    n_steps = len(t_array)
+    rho = self.turbine.rho
+    J = self.turbine.J
+    GenEff = self.turbine.GenEff
+    interp_cq = self.turbine.Cq.interp_surface
+    call_controller = self.controller_int.call_controller
+    rotor_area = np.pi * R**2
+
+    # Turbine state handed to the controller, reused every time step
+    turbine_state = dict.fromkeys(['iStatus', 't', 'dt', 'ws', 'bld_pitch', 'gen_torque', 'gen_speed',
+                                   'gen_eff', 'rot_speed', 'Yaw_fromNorth', 'Y_MeasErr'])
+    turbine_state['iStatus'] = 1
+    turbine_state['dt'] = dt
+    turbine_state['gen_eff'] = GenEff/100
+
+    profile = profiler is not None
+    if profile:
+        profiler.start_run()
 
     # Loop through time
-    for i, t in enumerate(t_array):
-        if i == 0:
-            continue  # Skip the first run
+    for i in range(1, n_steps):  # Skip the first run
+        if profile:
+            step_start = tic = profiler.now()
+        t = t_array[i]
         ws = ws_array[i]
         wd = wd_array[i]
         nac_yawerr[i] = (wd - nac_yaw[i-1])*deg2rad
         
-        print(nac_yawerr[i])
+        if verbose:
+            print(nac_yawerr[i])
+        if profile:
+            tic = profiler.lap('yaw_error', tic)
 
         # Load current Cq data
-        tsr = rot_speed[i-1] * self.turbine.rotor_radius / ws
-        cq = self.turbine.Cq.interp_surface([bld_pitch[i-1]], tsr)
+        tsr = rot_speed[i-1] * R / ws
+        cq = interp_cq([bld_pitch[i-1]], tsr)
+        if profile:
+            tic = profiler.lap('cq_interp', tic)
 
         # Update the turbine state
         #       -- 1DOF model: rotor speed and generator speed (scaled by Ng)
-        aero_torque[i] = 0.5 * self.turbine.rho * (np.pi * R**2) * cq * R * ws**2 * np.cos(nac_yawerr[i])**2  #Incorporate Yaw Misalignment in Aerodynamics: Add a cosine penalty to aero_torque (* np.cos(nac_yawerr[i])**2)
-        rot_speed[i] = rot_speed[i-1] + (dt/self.turbine.J)*(aero_torque[i]
-                                                             * self.turbine.GenEff/100 - self.turbine.Ng * gen_torque[i-1])
-        gen_speed[i] = rot_speed[i] * self.turbine.Ng
+        aero_torque[i] = 0.5 * rho * rotor_area * cq * R * ws**2 * np.cos(nac_yawerr[i])**2  #Incorporate Yaw Misalignment in Aerodynamics: Add a cosine penalty to aero_torque (* np.cos(nac_yawerr[i])**2)
+        rot_speed[i] = rot_speed[i-1] + (dt/J)*(aero_torque[i]
+                                                * GenEff/100 - GBRatio * gen_torque[i-1])
+        gen_speed[i] = rot_speed[i] * GBRatio
+        if profile:
+            tic = profiler.lap('rotor_dynamics', tic)
 
         # populate turbine state dictionary
-        turbine_state = {}
-        # populate turbine state dictionary
-        turbine_state = {}
-        if i < len(t_array)-1:
-            turbine_state['iStatus'] = 1
-        else:
+        if i == n_steps-1:
             turbine_state['iStatus'] = -1
         turbine_state['t'] = t
-        turbine_state['dt'] = dt
         turbine_state['ws'] = ws
         turbine_state['bld_pitch'] = bld_pitch[i-1]
         turbine_state['gen_torque'] = gen_torque[i-1]
         turbine_state['gen_speed'] = gen_speed[i]
-        turbine_state['gen_eff'] = self.turbine.GenEff/100
         turbine_state['rot_speed'] = rot_speed[i]
         turbine_state['Yaw_fromNorth'] = nac_yaw[i]
         turbine_state['Y_MeasErr'] = nac_yawerr[i-1]
+        if profile:
+            tic = profiler.lap('turbine_state', tic)
         
         # Call the controller
 
-        gen_torque[i], bld_pitch[i], nac_yawrate[i] = self.controller_int.call_controller(turbine_state)
+        gen_torque[i], bld_pitch[i], nac_yawrate[i] = call_controller(turbine_state)
+        if profile:
+            tic = profiler.lap('controller', tic)
 
         # Calculate the power
-        gen_power[i] = gen_speed[i] * gen_torque[i]
-        gen_power[i] = gen_speed[i] * gen_torque[i] * self.turbine.GenEff / 100
+        gen_power[i] = gen_speed[i] * gen_torque[i] * GenEff / 100
 
         # Update the nacelle position
         nac_yaw[i] = nac_yaw[i-1] + nac_yawrate[i]*rad2deg*dt
+        if profile:
+            profiler.lap('outputs', tic)
+            profiler.end_step(step_start)
         
         
     self.controller_int.kill_discon()
 
+    if profile:
+        profiler.end_run()
+        self.profile = profiler.summary()
+
     # Save these values
     self.bld_pitch = bld_pitch
     self.rot_speed = rot_speed
@@ -125,36 +166,50 @@ def sim_ws_wd_series(self, t_array, ws_array, wd_array,
     
     
     if make_plots:
-        fig, axarr = plt.subplots(nrows=6, sharex=True, figsize=(8, 14))
-
-        ax = axarr[0]
-        ax.plot(self.t_array, self.ws_array)
-        ax.set_ylabel('Wind Speed (m/s)')
-
-        ax = axarr[1]
-        ax.plot(self.t_array, self.wd_array, label='wind direction')
-        ax.plot(self.t_array, self.nac_yaw, label='yaw position')
-        ax.set_ylabel('Wind Direction (deg)')
-        ax.legend(loc='best')
-
-        ax = axarr[2]
-        #ax.plot(self.t_array, self.wd_array-self.nac_yaw)#*rad2deg
-        my_yaw_error = yaw_error(wind_dir=self.wd_array, nacelle_dir=self.nac_yaw)
-        ax.plot(self.t_array, my_yaw_error)
-        ax.set_ylabel('Nacelle yaw error (deg)')
-        
-        ax = axarr[3]
-        ax.plot(self.t_array, self.rot_speed)
-        ax.set_ylabel('Rot Speed (rad/s)')
-
-        ax = axarr[4]
-        ax.plot(self.t_array, self.gen_torque)
-        ax.set_ylabel('Gen Torque (N)')
-
-        ax = axarr[5]
-        ax.plot(self.t_array, self.bld_pitch*rad2deg)
-        ax.set_ylabel('Bld Pitch (deg)')
-                   
-        ax.set_xlabel('Time (s)')
-        for ax in axarr:
-            ax.grid()
\ No newline at end of file
+        plot_ws_wd_series(self)
+
+
+#function for calculate yaw_error
+def yaw_error(wind_dir, nacelle_dir):
+    error = wind_dir - nacelle_dir
+    error = ((error + 180) % 360) - 180
+    return error
+
+
+def plot_ws_wd_series(self):
+    '''
+    Plot the inputs and outputs stored on self by sim_ws_wd_series.
+    '''
+    fig, axarr = plt.subplots(nrows=6, sharex=True, figsize=(8, 14))
+
+    ax = axarr[0]
+    ax.plot(self.t_array, self.ws_array)
+    ax.set_ylabel('Wind Speed (m/s)')
+
+    ax = axarr[1]
+    ax.plot(self.t_array, self.wd_array, label='wind direction')
+    ax.plot(self.t_array, self.nac_yaw, label='yaw position')
+    ax.set_ylabel('Wind Direction (deg)')
+    ax.legend(loc='best')
+
+    ax = axarr[2]
+    #ax.plot(self.t_array, self.wd_array-self.nac_yaw)#*rad2deg
+    my_yaw_error = yaw_error(wind_dir=self.wd_array, nacelle_dir=self.nac_yaw)
+    ax.plot(self.t_array, my_yaw_error)
+    ax.set_ylabel('Nacelle yaw error (deg)')
+    
+    ax = axarr[3]
+    ax.plot(self.t_array, self.rot_speed)
+    ax.set_ylabel('Rot Speed (rad/s)')
+
+    ax = axarr[4]
+    ax.plot(self.t_array, self.gen_torque)
+    ax.set_ylabel('Gen Torque (N)')
+
+    ax = axarr[5]
+    ax.plot(self.t_array, self.bld_pitch*rad2deg)
+    ax.set_ylabel('Bld Pitch (deg)')
+               
+    ax.set_xlabel('Time (s)')
+    for ax in axarr:
+        ax.grid()
\ No newline at end of file